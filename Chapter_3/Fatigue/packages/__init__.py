@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+
+Lightweight top-level API of the fatigue check. The classes are imported
+from their modules on first access, so importing the package does not load
+NumPy, pandas or xlsxwriter until a code path needs them:
+
+    from packages import PermissibleSigma, FatigueKernel
+
+Created on 19 Oct 2026 10:55
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import importlib
+
+__version__ = '0.0.0'
+
+# Public names and the modules they are imported from.
+_API = {
+    'SteelValues': 'steelvalues',
+    'PermissibleSigma': 'sigma_permissible_fatigue',
+    'PermissibleTau': 'tau_permissible_fatigue',
+    'PermissibleStress': 'check_stress',
+    'ExportExcel': 'exportexcel',
+    'FatigueKernel': 'fatigue_kernel',
+    'kernel_inputs': 'fatigue_kernel',
+    'empty_results': 'fatigue_kernel',
+    'results_to_df': 'fatigue_kernel',
+    'get_backend': 'backends',
+    'available_backends': 'backends',
+    'ThreadedFatigue': 'threaded_fatigue',
+    'SharedFatigue': 'shared_fatigue',
+    'ResultStore': 'result_store',
+    'Tables': 'tables',
+    'EquivalenceHarness': 'equivalence',
+    'PreFilter': 'prefilter',
+    'Pipeline': 'pipeline',
+    'FatigueCompute': 'pipeline',
+    'read_chunks': 'pipeline',
+    'Checkpoint': 'checkpoint',
+    'run_stream': 'checkpoint',
+    'run_batch': 'checkpoint',
+    'Ingest': 'ingest',
+    'IngestError': 'ingest',
+    'CheckResult': 'check_result',
+    'iter_results': 'check_result',
+    'DistributedRun': 'distributed',
+    'LocalCoordinator': 'distributed',
+    'ResultDiff': 'result_diff',
+    'HaighDiagram': 'diagram',
+    'KernelProfile': 'profiler',
+    'serve': 'check_service'
+    }
+
+__all__ = list(_API)
+
+
+def __getattr__(name):
+    """Import the public name from its module on first access."""
+
+    if name not in _API:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = importlib.import_module('.' + _API[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Compute backends for the formulae of the fatigue check
+
+Created on 19 Oct 2026 10:57
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import threading
+
+import numpy as np
+
+
+class Formula:
+    """
+    Formula written once as a list of assignments over arrays and scalars.
+
+    The expressions use only arithmetic, comparisons, where(cond, a, b),
+    abs(x) and sqrt(x), so every backend evaluates them with the same
+    IEEE operations in the same order. where(cond, a, b) has the semantics
+    of a.where(cond, b) in pandas: b where cond is False or NaN.
+    """
+
+    def __init__(self, name, statements, outputs):
+        """
+        Parameters
+        ----------
+        name       : str  ; name of the formula.
+        statements : list ; (name, expression) assignments, in order.
+        outputs    : list ; names of the results of the formula.
+        """
+
+        self.name = name
+        self.statements = statements
+        self.outputs = outputs
+
+    def __repr__(self):
+        return f'Formula({self.name!r})'
+
+
+class Backend:
+    """
+    Interface of the compute backends.
+
+    evaluate() gets the variables, arrays of the same length or scalars,
+    and writes every output of the formula into the array of outs.
+    """
+
+    name = None
+
+    def evaluate(self, formula, variables, outs):
+        """
+        Parameters
+        ----------
+        formula   : Formula ; formula to evaluate.
+        variables : dict    ; arrays and scalars of the formula.
+        outs      : dict    ; output arrays for the outputs of the formula.
+        """
+
+        raise NotImplementedError
+
+
+class EvalBackend(Backend):
+    """Backend evaluating the expressions with Python over array objects."""
+
+    namespace = {}
+
+    def __init__(self):
+        self.code = {}  # Compiled expressions.
+
+    def compile(self, expression):
+        """Compiled code of the expression."""
+
+        if expression not in self.code:
+            self.code[expression] = compile(expression, expression, 'eval')
+
+        return self.code[expression]
+
+    def wrap(self, value):
+        """Array object of the backend for the value."""
+
+        return value
+
+    def unwrap(self, value):
+        """NumPy array for the array object of the backend."""
+
+        return value
+
+    def evaluate(self, formula, variables, outs):
+        local = {key: self.wrap(value) for key, value in variables.items()}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, expression in formula.statements:
+                local[name] = eval(
+                    self.compile(expression), self.namespace, local
+                    )
+        for name in formula.outputs:
+            np.copyto(outs[name], self.unwrap(local[name]))
+
+
+class NumpyBackend(EvalBackend):
+    """Pure NumPy backend."""
+
+    name = 'numpy'
+    namespace = {
+        '__builtins__': {},
+        'where': np.where,
+        'abs': np.abs,
+        'sqrt': np.sqrt
+        }
+
+
+class PandasBackend(EvalBackend):
+    """pandas Series backend, as the PermissibleSigma family of classes."""
+
+    name = 'pandas'
+    namespace = {
+        '__builtins__': {},
+        'where': lambda cond, a, b: a.where(cond, b),
+        'abs': abs,
+        'sqrt': np.sqrt
+        }
+
+    def __init__(self):
+        import pandas as pd
+
+        EvalBackend.__init__(self)
+        self.pd = pd
+
+    def wrap(self, value):
+        if isinstance(value, np.ndarray):
+            return self.pd.Series(value, copy=False)
+        return value
+
+    def unwrap(self, value):
+        return value.to_numpy()
+
+
+class NumexprBackend(Backend):
+    """numexpr backend, every statement evaluated in one numexpr call."""
+
+    name = 'numexpr'
+
+    def __init__(self):
+        import numexpr
+
+        self.numexpr = numexpr
+
+    def evaluate(self, formula, variables, outs):
+        local = dict(variables)
+        for name, expression in formula.statements:
+            local[name] = self.numexpr.evaluate(expression, local_dict=local)
+        for name in formula.outputs:
+            np.copyto(outs[name], local[name])
+
+
+class JitBackend(Backend):
+    """
+    Numba backend, every formula compiled into one loop over the rows with
+    scalar arithmetic and no temporary arrays. The loops release the GIL,
+    so the threads of ThreadedFatigue run them in parallel.
+    """
+
+    name = 'jit'
+
+    def __init__(self):
+        import numba
+
+        self.numba = numba
+        self.loops = {}  # Compiled loops by formula and array variables.
+        self.lock = threading.Lock()  # One compilation of every loop.
+
+        @numba.njit
+        def where(cond, a, b):
+            return a if cond else b
+
+        self.namespace = {'np': np, 'where': where, 'sqrt': np.sqrt}
+
+    def compile(self, formula, arrays, scalars):
+        """Compiled loop of the formula for the array and scalar variables."""
+
+        key = (formula.name, arrays, scalars)
+        with self.lock:
+            if key not in self.loops:
+                self.loops[key] = self.build(formula, arrays, scalars)
+
+        return self.loops[key]
+
+    def build(self, formula, arrays, scalars):
+        """Numba dispatcher of the loop of the formula, compiled on use."""
+
+        args = (
+            [a + '_in' for a in arrays] + list(scalars) +
+            [o + '_out' for o in formula.outputs]
+            )
+        lines = [f'def loop({", ".join(args)}):']
+        lines.append(f'    for i in range(len({args[-1]})):')
+        lines += [f'        {a} = {a}_in[i]' for a in arrays]
+        lines += [f'        {n} = {e}' for n, e in formula.statements]
+        lines += [f'        {o}_out[i] = {o}' for o in formula.outputs]
+        namespace = dict(self.namespace)
+        exec('\n'.join(lines), namespace)
+
+        return self.numba.njit(error_model='numpy', nogil=True)(
+            namespace['loop']
+            )
+
+    def evaluate(self, formula, variables, outs):
+        arrays = tuple(
+            k for k, v in variables.items() if isinstance(v, np.ndarray)
+            )
+        scalars = tuple(k for k in variables if k not in arrays)
+        loop = self.compile(formula, arrays, scalars)
+        args = (
+            [variables[a] for a in arrays] +
+            [float(variables[s]) for s in scalars] +
+            [outs[o] for o in formula.outputs]
+            )
+        loop(*args)
+
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'numpy': NumpyBackend,
+    'numexpr': NumexprBackend,
+    'jit': JitBackend
+    }
+
+_backends = {}  # Backends already created, the JIT keeps its loops.
+
+
+def get_backend(backend='numpy'):
+    """
+    Backend for the name backend, or backend itself if it is a Backend.
+    Raises ImportError when the optional dependency is missing.
+    """
+
+    if isinstance(backend, Backend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(
+            f'wrong backend {backend!r}, choose one of {list(BACKENDS)}'
+            )
+    if backend not in _backends:
+        _backends[backend] = BACKENDS[backend]()
+
+    return _backends[backend]
+
+
+def available_backends():
+    """List with the names of the backends that can be used here."""
+
+    names = []
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+
+    return names
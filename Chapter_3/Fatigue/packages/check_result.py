@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Zero-copy result of the fatigue check for downstream consumers
+
+Created on 19 Oct 2026 11:08
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+The kernel writes its outputs straight into the buffers of a CheckResult,
+so the consumers get the arrays of the engine without a copy:
+
+- layout='records' : one NumPy structured array, a record per point; the
+                     kernel writes through the field views.
+- layout='columns' : one contiguous array per column, wrapped by Arrow
+                     without a copy (pyarrow is optional).
+
+Validate and screened are a boolean byte per point in NumPy and are
+bit-packed by Arrow, the only columns that Arrow copies.
+"""
+
+import numpy as np
+
+from .fatigue_kernel import OUTPUTS
+from .tables import CATEGORIES
+
+
+# Fields of the result: keys, extreme stresses and outputs of the kernel.
+FIELDS = [
+    ('bar', 'int64'),
+    ('node', 'int64'),
+    ('component_group', 'int8'),  # Codes of GROUPS.
+    ('noth_effect', 'int8'),  # Codes of NOTCHES.
+    ('sigma_x_max', 'float64'),
+    ('sigma_y_max', 'float64'),
+    ('tau_xy_max', 'float64')
+    ] + [
+    (key, 'bool' if key == 'validate' else 'float64') for key in OUTPUTS
+    ] + [
+    ('screened', 'bool')  # Points screened by the PreFilter.
+    ]
+
+DTYPE = np.dtype(FIELDS)
+
+
+class CheckResult:
+    """
+    Complete result of the fatigue check of n_rows points: keys,
+    permissible stresses, ratios and Validate.
+    """
+
+    def __init__(self, n_rows, layout='columns'):
+        """
+        Parameters
+        ----------
+        n_rows : int ; number of points.
+        layout : str ; 'records' for a structured array, 'columns' for one
+                       array per column.
+        """
+
+        self.n_rows = n_rows
+        self.layout = layout
+
+        if layout == 'records':
+            self.records = np.empty(n_rows, dtype=DTYPE)
+            self.columns = {name: self.records[name] for name in DTYPE.names}
+        elif layout == 'columns':
+            self.records = None
+            self.columns = {
+                name: np.empty(n_rows, dtype=dtype) for name, dtype in FIELDS
+                }
+        else:
+            raise ValueError(f'wrong layout: {layout!r}')
+
+    def get_columns(self):
+        """Dict with the arrays of the fields, views of the buffers."""
+
+        return self.columns
+
+    def get_outputs(self):
+        """Output arrays of the kernel, views of the buffers."""
+
+        return {key: self.columns[key] for key in OUTPUTS}
+
+    def get_records(self):
+        """
+        NumPy structured array of the result, without a copy in the
+        'records' layout.
+        """
+
+        if self.records is not None:
+            return self.records
+
+        records = np.empty(self.n_rows, dtype=DTYPE)
+        for name, values in self.columns.items():
+            records[name] = values
+
+        return records
+
+    def to_arrow(self):
+        """
+        pyarrow Table of the result, without a copy of the numeric columns
+        in the 'columns' layout. The component groups and notch effects are
+        dictionary arrays over their codes.
+        """
+
+        import pyarrow as pa
+
+        arrays = []
+        for name, values in self.columns.items():
+            if name in CATEGORIES:
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values), pa.array(CATEGORIES[name])
+                    ))
+            else:
+                arrays.append(pa.array(values))
+
+        return pa.Table.from_arrays(arrays, names=list(self.columns))
+
+    def iter_records(self, chunk_size=65536):
+        """Generator of structured arrays of chunk_size rows, views."""
+
+        records = self.get_records()
+        for start in range(0, self.n_rows, chunk_size):
+            yield records[start:start + chunk_size]
+
+    def iter_batches(self, chunk_size=65536):
+        """Generator of pyarrow RecordBatches of chunk_size rows, views."""
+
+        yield from self.to_arrow().to_batches(max_chunksize=chunk_size)
+
+    def get_df(self):
+        """pandas DataFrame with the columns of the notebook, a copy."""
+
+        import pandas as pd
+
+        from .result_store import COLUMNS
+
+        df = pd.DataFrame({
+            COLUMNS[name][0]: values for name, values in self.columns.items()
+            })
+        for name, categories in CATEGORIES.items():
+            df[name] = np.asarray(categories, dtype=object)[df[name]]
+        df[OUTPUTS['validate']] = np.where(
+            self.columns['validate'], 'yes', 'no'
+            )
+
+        return df
+
+
+def iter_results(chunks, compute, layout='columns'):
+    """
+    Generator of the CheckResult of every chunk of RSA stresses, for the
+    streaming consumers.
+
+    Parameters
+    ----------
+    chunks  : iterable       ; chunks of input, pandas DataFrames.
+    compute : FatigueCompute ; fatigue check of one chunk.
+    layout  : str            ; layout of the results.
+    """
+
+    for df in chunks:
+        yield compute.check(df, layout)
+
+
+if __name__ == '__main__':
+
+    from .pipeline import FatigueCompute, read_chunks
+    from .tables import DB_DIR, Tables
+
+    compute = FatigueCompute(Tables(DB_DIR), 'S 355')
+    df = next(read_chunks('xlsx/RSA stresses.xlsx'))
+
+    result = compute.check(df, layout='records')
+    records = result.get_records()
+    print(records[['bar', 'node', 'ratio_1', 'validate']][:5])
+    print(np.shares_memory(records, result.get_outputs()['ratio_1']))
+
+    result = compute.check(df)
+    table = result.to_arrow()
+    print(table.schema)
+    buffer = table.column('ratio_1').chunk(0).buffers()[1]
+    print(buffer.address == result.get_columns()['ratio_1'].ctypes.data)
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Local check service with warm tables and request batching
+
+Created on 19 Oct 2026 10:54
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    python -m packages.check_service --db-dir SQL --port 8131
+
+    POST /check
+    {
+        "steel_grade": "S 355",
+        "points": {
+            "component_group": ["E5", ...],
+            "noth_effect": ["K2", ...],
+            "sigma_x_max_[MPa]": [...], "sigma_x_min_[MPa]": [...],
+            "sigma_y_max_[MPa]": [...], "sigma_y_min_[MPa]": [...],
+            "tau_xy_max_[MPa]": [...], "tau_xy_min_[MPa]": [...]
+        }
+    }
+
+The stresses follow the generally accepted sign criterion, tension positive
+and compression negative, that is, after the sign flip of the RSA values.
+The results that are not finite, as the ratios over a zero permissible
+stress, are null in the reply.
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .fatigue_kernel import empty_results
+from .tables import Tables, add_arguments
+
+
+class Batcher:
+    """
+    Combine the concurrent small requests into one vectorized batch per
+    steel grade.
+
+    The first request waits at most window seconds for others to join the
+    batch, up to max_rows points.
+    """
+
+    def __init__(self, tables, window=0.002, max_rows=1_000_000):
+        """
+        Parameters
+        ----------
+        tables   : Tables ; warm tables and kernels.
+        window   : float  ; [s] time to collect a batch.
+        max_rows : int    ; maximum number of points of a batch.
+        """
+
+        self.tables = tables
+        self.window = window
+        self.max_rows = max_rows
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, steel_grade, points):
+        """Future with the results of the points of one request."""
+
+        if steel_grade not in self.tables.kernels:
+            raise ValueError(f'wrong steel grade: {steel_grade!r}')
+        inputs = self.tables.inputs(steel_grade, points)
+        future = Future()
+        self.queue.put((steel_grade, inputs, future))
+
+        return future
+
+    def collect(self):
+        """Requests of the next batch."""
+
+        batch = [self.queue.get()]
+        n_rows = len(batch[0][1]['sigma_W'])
+        deadline = time.perf_counter() + self.window
+        while n_rows < self.max_rows:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_rows += len(request[1]['sigma_W'])
+
+        return batch
+
+    def loop(self):
+        """Run the batches for ever."""
+
+        while True:
+            batch = self.collect()
+            by_grade = {}
+            for steel_grade, inputs, future in batch:
+                by_grade.setdefault(steel_grade, []).append((inputs, future))
+            for steel_grade, requests in by_grade.items():
+                try:
+                    self.run(steel_grade, requests)
+                except Exception as e:
+                    for inputs, future in requests:
+                        future.set_exception(e)
+
+    def run(self, steel_grade, requests):
+        """Run the requests of one steel grade as a single batch."""
+
+        inputs = {
+            key: np.concatenate([r[0][key] for r in requests])
+            for key in requests[0][0]
+            }
+        n = len(inputs['sigma_W'])
+        results = empty_results(n)
+        self.tables.get_kernel(steel_grade).run(inputs, results)
+
+        start = 0
+        for request_inputs, future in requests:
+            stop = start + len(request_inputs['sigma_W'])
+            future.set_result(
+                {key: values[start:stop] for key, values in results.items()}
+                )
+            start = stop
+
+
+def to_list(values):
+    """List of the array values for JSON, NaN and inf as None (null)."""
+
+    if values.dtype.kind != 'f':
+        return values.tolist()
+
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+class Handler(BaseHTTPRequestHandler):
+    """HTTP handler of the check service."""
+
+    batcher = None
+
+    def do_GET(self):
+        if self.path != '/health':
+            self.send_error(404)
+            return
+        self.reply(200, {
+            'status': 'ok',
+            'steel_grades': self.batcher.tables.get_steel_grades()
+            })
+
+    def do_POST(self):
+        if self.path != '/check':
+            self.send_error(404)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            future = self.batcher.submit(
+                request['steel_grade'], request['points']
+                )
+        except (KeyError, TypeError, ValueError) as e:
+            self.reply(400, {'error': f'{type(e).__name__}: {e}'})
+            return
+        try:
+            results = future.result()
+        except Exception as e:
+            self.reply(500, {'error': f'{type(e).__name__}: {e}'})
+            return
+        self.reply(200, {
+            key: to_list(values) for key, values in results.items()
+            })
+
+    def reply(self, status, body):
+        body = json.dumps(body, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    """Threading HTTP server with room for many concurrent clients."""
+
+    request_queue_size = 128
+
+
+def serve(db_dir, host='127.0.0.1', port=8131, window=0.002,
+          backend='numpy'):
+    """HTTP server of the check service, not started."""
+
+    handler = type('Handler', (Handler,), {
+        'batcher': Batcher(Tables(db_dir, backend), window=window)
+        })
+
+    return Server((host, port), handler)
+
+
+def main():
+    """Command line entry point of the check service."""
+
+    parser = argparse.ArgumentParser(
+        description='Local fatigue check service.'
+        )
+    add_arguments(parser, steel_grade=False)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8131)
+    parser.add_argument(
+        '--window-ms', type=float, default=2.0,
+        help='time to collect a batch of requests [ms]'
+        )
+    args = parser.parse_args()
+
+    server = serve(
+        args.db_dir, args.host, args.port, args.window_ms / 1000,
+        args.backend
+        )
+    print(f'Fatigue check service on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == '__main__':
+
+    main()
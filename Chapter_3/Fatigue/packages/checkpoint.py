@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Checkpointing and resumable execution of streaming and batch runs
+
+Created on 19 Oct 2026 11:01
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    python -m packages.checkpoint model_1.xlsx model_2.xlsx ... \
+        --out results --steel-grade "S 355"
+
+Run the same command again after an interruption to resume from the last
+checkpoint, results/checkpoint.json by default.
+
+    python -m packages.checkpoint --self-check
+
+interrupts a run of a CSV mid-way, resumes it and compares the result store
+with the one of an uninterrupted run, byte for byte.
+"""
+
+import argparse
+import json
+import os
+
+from .pipeline import FatigueCompute, Pipeline, read_chunks
+from .result_store import ResultStore
+from .tables import add_arguments, get_tables
+
+
+class Checkpoint:
+    """
+    Durable record of the completed chunks and files of a run, with the
+    number of rows written to their outputs.
+
+    Every update is written to a temporary file, synced and renamed over
+    the checkpoint, so the checkpoint on disk is always a complete one.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str ; checkpoint file, created on the first update.
+        """
+
+        self.path = path
+
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+        else:
+            self.state = {'runs': {}}
+
+    def get(self, key):
+        """State of the run key, None if it has not started."""
+
+        return self.state['runs'].get(key)
+
+    def is_done(self, key):
+        """True if the run key is complete."""
+
+        state = self.get(key)
+
+        return bool(state and state['done'])
+
+    def update(self, key, **state):
+        """Update the state of the run key and save the checkpoint."""
+
+        self.state['runs'].setdefault(key, {}).update(state)
+        self.save()
+
+    def save(self):
+        """Write the checkpoint atomically and durably."""
+
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)  # The rename is durable too.
+        finally:
+            os.close(fd)
+
+
+class CheckpointedStoreWriter:
+    """
+    Append the chunks to a ResultStore and record every one in the
+    checkpoint once its rows are on disk.
+    """
+
+    def __init__(self, store, checkpoint, key):
+        """
+        Parameters
+        ----------
+        store      : ResultStore ; output of the run.
+        checkpoint : Checkpoint  ; checkpoint of the run.
+        key        : str         ; name of the run in the checkpoint.
+        """
+
+        self.store = store
+        self.checkpoint = checkpoint
+        self.key = key
+
+    def __call__(self, columns):
+        self.store.append(columns)
+        self.store.sync()
+        chunks = self.checkpoint.get(self.key)['chunks'] + 1
+        self.checkpoint.update(
+            self.key, chunks=chunks, rows=self.store.get_n_rows()
+            )
+
+    def close(self):
+        self.store.sync()
+
+
+def run_stream(path, store_path, compute, checkpoint, key=None,
+               chunk_size=100_000):
+    """
+    Resumable fatigue check of the RSA stresses file path into the result
+    store store_path.
+
+    A run interrupted after some chunks resumes after the last recorded
+    chunk: the store is cut back to the rows of the checkpoint and the
+    input is read from the next chunk, so the final store is byte-identical
+    to the one of an uninterrupted run. The checkpoint records the chunk
+    size, the store, the settings of compute and the size and modification
+    time of the input, and a run only resumes with the same ones.
+
+    Parameters
+    ----------
+    path       : str            ; RSA stresses, .xlsx or .csv.
+    store_path : str            ; directory of the result store.
+    compute    : FatigueCompute ; fatigue check of one chunk.
+    checkpoint : Checkpoint     ; checkpoint of the run.
+    key        : str            ; name of the run in the checkpoint, the
+                                  absolute path by default.
+    chunk_size : int            ; number of rows of every chunk.
+    """
+
+    key = key or os.path.abspath(path)
+    stat = os.stat(path)
+    run = {
+        'store': store_path,
+        'chunk_size': chunk_size,
+        'settings': compute.get_settings(),
+        'input': {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        }
+
+    meta = os.path.join(store_path, 'meta.json')
+    state = checkpoint.get(key)
+    if state:
+        for name, value in run.items():
+            if state.get(name) != value:
+                raise ValueError(
+                    f'{key} was started with {name} {state.get(name)}, '
+                    f'not {value}'
+                    )
+        if state['done']:
+            return state
+        if os.path.exists(meta):
+            store = ResultStore(store_path, mode='r+')
+            store.resize(state['rows'])
+        elif state['rows'] == 0:
+            store = ResultStore.create(store_path)
+        else:
+            raise FileNotFoundError(f'result store {store_path} is missing')
+    else:
+        if os.path.exists(meta):
+            raise FileExistsError(
+                f'result store {store_path} exists and is not in the '
+                f'checkpoint, remove it or use another directory'
+                )
+        checkpoint.update(key, chunks=0, rows=0, done=False, **run)
+        store = ResultStore.create(store_path)
+        store.sync()
+
+    chunks = read_chunks(path, chunk_size, checkpoint.get(key)['chunks'])
+    writer = CheckpointedStoreWriter(store, checkpoint, key)
+    Pipeline(chunks, compute, writer).run()
+    checkpoint.update(key, done=True)
+
+    return checkpoint.get(key)
+
+
+def store_names(paths):
+    """
+    Names of the result stores of the files paths: their paths relative to
+    the common directory, without extension and with '__' for the
+    separators, so files with the same name in different directories get
+    different stores. Raises ValueError for repeated names.
+    """
+
+    paths = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    names = [
+        os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, '__')
+        for path in paths
+        ]
+    repeated = sorted({name for name in names if names.count(name) > 1})
+    if repeated:
+        raise ValueError(f'repeated result stores: {", ".join(repeated)}')
+
+    return names
+
+
+def run_batch(paths, out_dir, compute, checkpoint=None, chunk_size=100_000):
+    """
+    Resumable fatigue check of many RSA stresses files, one result store
+    per file in out_dir, named by store_names(). Completed files are skipped
+    when resuming and the file in progress resumes from its last chunk.
+    Returns the states of the runs by path.
+    """
+
+    names = store_names(paths)
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = checkpoint or Checkpoint(
+        os.path.join(out_dir, 'checkpoint.json')
+        )
+
+    states = {}
+    for path, name in zip(paths, names):
+        states[path] = run_stream(
+            path, os.path.join(out_dir, name), compute, checkpoint,
+            chunk_size=chunk_size
+            )
+
+    return states
+
+
+def self_check(chunk_size=1000):
+    """
+    Interrupt a run of a CSV mid-way, resume it and compare the result
+    store with the one of an uninterrupted run, byte for byte. Returns True
+    if every file of the stores is identical.
+    """
+
+    import filecmp
+    import tempfile
+
+    import pandas as pd
+
+    from .tables import DB_DIR, Tables
+
+    class InterruptedCompute(FatigueCompute):
+        """FatigueCompute stopped after n_chunks chunks, as a killed run."""
+
+        def __init__(self, tables, steel_grade, n_chunks):
+            FatigueCompute.__init__(self, tables, steel_grade)
+            self.n_chunks = n_chunks
+
+        def __call__(self, df):
+            if not self.n_chunks:
+                raise KeyboardInterrupt('run stopped')
+            self.n_chunks -= 1
+            return FatigueCompute.__call__(self, df)
+
+    tables = Tables(DB_DIR)
+    df = pd.read_excel(
+        os.path.join(DB_DIR, os.pardir, 'xlsx', 'RSA stresses.xlsx')
+        )
+    df = pd.concat([df] * 400, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.csv')
+        df.to_csv(path, index=False)
+        whole = os.path.join(tmp, 'whole')
+        resumed = os.path.join(tmp, 'resumed')
+
+        compute = FatigueCompute(tables, 'S 355')
+        run_stream(path, whole, compute, Checkpoint(whole + '.json'),
+                   chunk_size=chunk_size)
+
+        checkpoint = Checkpoint(resumed + '.json')
+        try:
+            run_stream(path, resumed, InterruptedCompute(tables, 'S 355', 5),
+                       checkpoint, chunk_size=chunk_size)
+        except KeyboardInterrupt:
+            state = checkpoint.get(os.path.abspath(path))
+            print(f'interrupted : after {state["rows"]} rows')
+        store = ResultStore(resumed, mode='r+')
+        store.resize(store.get_n_rows() + 500)  # Rows after the checkpoint.
+        del store
+
+        checkpoint = Checkpoint(resumed + '.json')  # As a new process.
+        state = run_stream(path, resumed, compute, checkpoint,
+                           chunk_size=chunk_size)
+        print(f'resumed     : {state["chunks"]} chunks, {state["rows"]} rows')
+
+        names = sorted(os.listdir(whole))
+        match, mismatch, errors = filecmp.cmpfiles(
+            whole, resumed, names, shallow=False
+            )
+        print(f'identical   : {len(match)} of {len(names)} files')
+        print(f'different   : {mismatch + errors}')
+
+    return len(match) == len(names)
+
+
+def main():
+    """Command line entry point of the resumable batch run."""
+
+    parser = argparse.ArgumentParser(
+        description='Resumable fatigue check of RSA stresses files.'
+        )
+    parser.add_argument('inputs', nargs='*', help='RSA stresses files')
+    parser.add_argument('--out', help='output directory')
+    parser.add_argument('--checkpoint', help='checkpoint file')
+    add_arguments(parser)
+    parser.add_argument('--chunk', type=int, default=100_000)
+    parser.add_argument(
+        '--self-check', action='store_true',
+        help='interrupt and resume a run, compare with an uninterrupted one'
+        )
+    args = parser.parse_args()
+
+    if args.self_check:
+        if not self_check():
+            raise SystemExit(1)
+        return
+    if not args.inputs or not args.out:
+        parser.error('the inputs and --out are required')
+
+    compute = FatigueCompute(
+        get_tables(args), args.steel_grade, backend=args.backend
+        )
+    checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+    states = run_batch(args.inputs, args.out, compute, checkpoint, args.chunk)
+    for path, state in states.items():
+        print(f'{path}: {state["rows"]} rows in {state["store"]}')
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Haigh diagram of the permissible normal stresses with the density of points
+
+Created on 19 Oct 2026 11:11
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    python -m packages.diagram "xlsx/RSA stresses.xlsx" haigh.png \
+        --steel-grade "S 355"
+
+For every component group and notch effect the diagram shows the
+permissible tension stress sigma_t(k) and compression stress -sigma_c(k) of
+PermissibleSigma over -1 ≤ k ≤ 1, and the checked points (k, sigma_max) of
+the x and y directions binned into a density grid. A point passes the check
+of its direction when it lies between the two curves.
+"""
+
+import argparse
+
+import numpy as np
+
+from .fatigue_kernel import empty_results
+from .ingest import Ingest
+from .tables import GROUPS, NOTCHES
+
+
+class HaighDiagram:
+    """
+    Density grids of the checked points per component group and notch
+    effect, with the analytic curves computed once at fixed resolution.
+
+    The points are accumulated chunk by chunk into fixed grids, so the
+    memory and the rendering time do not depend on the number of points.
+    """
+
+    def __init__(self, tables, steel_grade, k_bins=200, stress_bins=200,
+                 resolution=401, stress_limit=None):
+        """
+        Parameters
+        ----------
+        tables       : Tables ; material and basic stress tables.
+        steel_grade  : str    ; steel grade of the material.
+        k_bins       : int    ; bins of the grid over -1 ≤ k ≤ 1.
+        stress_bins  : int    ; bins of the grid over the stresses.
+        resolution   : int    ; points of the curves over -1 ≤ k ≤ 1.
+        stress_limit : float  ; [MPa] the grid covers ±stress_limit, 1.25
+                                times the highest permissible stress by
+                                default. Points beyond fall in the edge bins.
+        """
+
+        self.steel_grade = steel_grade
+        self.k = np.linspace(-1, 1, resolution)
+        self.tension, self.compression = self.get_curves(
+            tables.get_kernel(steel_grade), tables.get_sigma_W(steel_grade)
+            )
+
+        if stress_limit is None:
+            stress_limit = 1.25 * np.nanmax(
+                [np.nanmax(self.tension), -np.nanmin(self.compression)]
+                )
+        self.stress_limit = stress_limit
+        self.k_bins = k_bins
+        self.stress_bins = stress_bins
+        self.counts = np.zeros(
+            (len(GROUPS), len(NOTCHES), k_bins, stress_bins), dtype='int64'
+            )
+
+    def get_curves(self, kernel, sigma_W):
+        """
+        Permissible tension and compression stresses over self.k for every
+        group and notch of sigma_W, arrays [group, notch, k], with one run
+        of the kernel. The compression stresses are negative.
+        """
+
+        n_k = len(self.k)
+        n = sigma_W.size * n_k
+        ones = np.ones(n)
+        k = np.tile(self.k, sigma_W.size)
+        inputs = {
+            'sigma_W': np.repeat(sigma_W.ravel(), n_k),
+            'sigma_W0': np.repeat(sigma_W.ravel(), n_k),
+            'k_sx': k,
+            'k_sy': k,
+            'k_txy': k,
+            'sigma_x_max': ones,
+            'sigma_y_max': ones,
+            'tau_xy_max': ones
+            }
+        results = empty_results(n)
+        kernel.run(inputs, results)
+        shape = sigma_W.shape + (n_k,)
+
+        return (
+            results['sigma_tx'].reshape(shape),
+            results['sigma_cx'].reshape(shape)
+            )
+
+    def add(self, group, notch, k, stress):
+        """
+        Add points to the grids.
+
+        Parameters
+        ----------
+        group  : numpy array ; codes of the component groups.
+        notch  : numpy array ; codes of the notch effects.
+        k      : numpy array ; ratios between the extreme stresses.
+        stress : numpy array ; [MPa] extreme stresses, tension positive.
+        """
+
+        valid = np.isfinite(k) & np.isfinite(stress) & (group >= 0) & \
+            (notch >= 0)
+        i_k = (k[valid] + 1) * (self.k_bins / 2)
+        i_k = np.clip(i_k.astype('int64'), 0, self.k_bins - 1)
+        i_s = (stress[valid] + self.stress_limit) * (
+            self.stress_bins / (2 * self.stress_limit)
+            )
+        i_s = np.clip(i_s, 0, self.stress_bins - 1).astype('int64')
+
+        combo = group[valid].astype('int64') * len(NOTCHES) + notch[valid]
+        flat = (combo * self.k_bins + i_k) * self.stress_bins + i_s
+        self.counts += np.bincount(
+            flat, minlength=self.counts.size
+            ).reshape(self.counts.shape)
+
+    def add_ingest(self, ingest, directions=('x', 'y')):
+        """Add the points of an Ingest in the directions x and y."""
+
+        for direction in directions:
+            i = 'xy'.index(direction)
+            self.add(
+                ingest.group, ingest.notch, ingest.k[i], ingest.maxima[i]
+                )
+
+    def add_chunks(self, chunks, rsa_sign=True, directions=('x', 'y')):
+        """Add the points of the chunks of RSA stresses, DataFrames."""
+
+        for df in chunks:
+            self.add_ingest(Ingest(df, rsa_sign), directions)
+
+    def get_n_points(self):
+        """Number of points in the grids."""
+
+        return int(self.counts.sum())
+
+    def render(self, path, dpi=100, panel_size=2.5):
+        """
+        Save the diagram as an image, one panel per component group and
+        notch effect with points.
+        """
+
+        from matplotlib.colors import LogNorm
+        from matplotlib.figure import Figure
+
+        used = self.counts.sum(axis=(2, 3)) > 0
+        groups = np.flatnonzero(used.any(axis=1))
+        notches = np.flatnonzero(used.any(axis=0))
+        if not len(groups):
+            raise ValueError('no points to render')
+
+        fig = Figure(figsize=(
+            panel_size * len(notches) + 1, panel_size * len(groups) + 0.5
+            ))
+        axes = fig.subplots(
+            len(groups), len(notches), sharex=True, sharey=True,
+            squeeze=False
+            )
+        extent = [-1, 1, -self.stress_limit, self.stress_limit]
+        norm = LogNorm(vmin=1, vmax=max(self.counts.max(), 1))
+        image = None
+        for row, g in enumerate(groups):
+            for col, n in enumerate(notches):
+                ax = axes[row, col]
+                counts = self.counts[g, n].T.astype(float)
+                counts[counts == 0] = np.nan
+                image = ax.imshow(
+                    counts, extent=extent, origin='lower', aspect='auto',
+                    norm=norm, cmap='viridis', interpolation='nearest'
+                    )
+                ax.plot(self.k, self.tension[g, n], color='tab:red', lw=1)
+                ax.plot(self.k, self.compression[g, n], color='tab:blue',
+                        lw=1)
+                ax.axhline(0, color='grey', lw=0.5)
+                ax.set_title(f'{GROUPS[g]} {NOTCHES[n]}', fontsize=8)
+                ax.tick_params(labelsize=7)
+        for ax in axes[-1]:
+            ax.set_xlabel('k', fontsize=8)
+        for ax in axes[:, 0]:
+            ax.set_ylabel('sigma_max [MPa]', fontsize=8)
+        fig.suptitle(
+            f'Permissible stresses {self.steel_grade}, '
+            f'{self.get_n_points()} points'
+            )
+        fig.colorbar(image, ax=axes, label='points', shrink=0.6)
+        fig.savefig(path, dpi=dpi)
+
+        return path
+
+
+def main():
+    """Command line entry point of the Haigh diagram."""
+
+    from .pipeline import read_chunks
+    from .tables import add_arguments, get_tables
+
+    parser = argparse.ArgumentParser(
+        description='Haigh diagram of the RSA stresses of a model.'
+        )
+    parser.add_argument('input', help='RSA stresses, .xlsx or .csv')
+    parser.add_argument('output', help='image file, .png or .svg')
+    add_arguments(parser)
+    parser.add_argument('--chunk', type=int, default=100_000)
+    parser.add_argument('--bins', type=int, default=200)
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+
+    diagram = HaighDiagram(
+        get_tables(args), args.steel_grade, args.bins, args.bins
+        )
+    diagram.add_chunks(read_chunks(args.input, args.chunk))
+    diagram.render(args.output, args.dpi)
+    print(f'{diagram.get_n_points()} points in {args.output}')
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Distributed execution of partitioned fatigue checks on worker nodes
+
+Created on 19 Oct 2026 11:07
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    python -m packages.distributed model_1.xlsx model_2.xlsx ... \
+        --out results --steel-grade "S 355" --workers 8
+
+    python -m packages.distributed big_model.csv --out results --parts 16
+
+The inputs are split into partitions, one per file or, with --parts, one per
+range of chunks of every file, and every worker checks only its own rows.
+The rows before its range are still read to reach it: the lines of a .csv
+are tokenized and dropped, and the rows of an .xlsx are walked from the
+first one, so the later partitions of an .xlsx take longer to read.
+Every partition runs on a worker with the pipelined fatigue check into its
+own result store under the output directory, and the stores are merged, in
+partition order, into results/merged, the rows in the order of the inputs.
+
+The coordinator sends the partitions to the workers. LocalCoordinator runs
+them on a pool of processes of this machine; a coordinator of worker nodes
+only has to implement submit() with the same contract, the nodes sharing the
+input files, the SQL directory and the output directory.
+"""
+
+import argparse
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .pipeline import FatigueCompute, Pipeline, StoreWriter, read_chunks
+from .result_store import ResultStore
+from .tables import Tables, add_arguments
+
+
+class Partition:
+    """Part of the input of a distributed run: a file or its chunk range."""
+
+    def __init__(self, path, name, chunks=None):
+        """
+        Parameters
+        ----------
+        path   : str   ; RSA stresses, .xlsx or .csv.
+        name   : str   ; name of the partition and of its result store.
+        chunks : tuple ; (start_chunk, n_chunks) of the partition, in chunks
+                         of the chunk_size of the run, the whole file by
+                         default.
+        """
+
+        self.path = path
+        self.name = name
+        self.chunks = chunks
+
+    def read(self, chunk_size):
+        """Generator of the chunks of the partition, pandas DataFrames."""
+
+        if self.chunks is None:
+            return read_chunks(self.path, chunk_size)
+        start_chunk, n_chunks = self.chunks
+
+        return read_chunks(self.path, chunk_size, start_chunk, n_chunks)
+
+    def __repr__(self):
+        chunks = '' if self.chunks is None else f', chunks={self.chunks}'
+        return f'Partition({self.name!r}{chunks})'
+
+
+def partition_files(paths):
+    """One partition per file of paths."""
+
+    return [
+        Partition(path, os.path.splitext(os.path.basename(path))[0])
+        for path in paths
+        ]
+
+
+def count_rows(path, block_size=1 << 20):
+    """
+    Number of rows of the RSA stresses file path without the header. The
+    lines of a .csv are counted in binary blocks, without parsing them. The
+    rows of an .xlsx are taken from its dimension record or, when it has
+    none, counted.
+    """
+
+    if os.path.splitext(path)[1].lower() != '.csv':
+        import openpyxl
+
+        wb = openpyxl.load_workbook(path, read_only=True)
+        try:
+            ws = wb.active
+            rows = ws.max_row
+            if rows is None:  # No dimension record in read-only mode.
+                rows = sum(1 for _ in ws.iter_rows(values_only=True))
+            return max(rows - 1, 0)
+        finally:
+            wb.close()
+
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':  # Last line without end of line.
+        lines += 1
+
+    return max(lines - 1, 0)
+
+
+def partition_chunks(path, n_partitions, chunk_size=100_000):
+    """
+    n_partitions partitions of the file path with about the same number of
+    chunks of chunk_size rows each. The chunk_size must be the one of the
+    run.
+    """
+
+    n_chunks = -(-count_rows(path) // chunk_size)
+    name = os.path.splitext(os.path.basename(path))[0]
+    partitions = []
+    for part in np.array_split(
+            np.arange(n_chunks), max(min(n_partitions, n_chunks), 1)):
+        if not len(part):
+            continue
+        first, last = int(part[0]), int(part[-1])
+        partitions.append(Partition(
+            path, f'{name}_chunks_{first}-{last}', (first, len(part))
+            ))
+
+    return partitions
+
+
+_tables = {}  # Tables of the worker process by (db_dir, backend).
+
+
+def run_partition(partition, out_dir, db_dir, steel_grade, backend='numpy',
+                  chunk_size=100_000):
+    """
+    Fatigue check of one partition into the result store out_dir/name, on
+    a worker. The tables are loaded once per worker process.
+
+    Returns the statistics of the partition.
+    """
+
+    t0 = time.perf_counter()
+    key = (db_dir, backend)
+    if key not in _tables:
+        _tables[key] = Tables(db_dir, backend)
+    compute = FatigueCompute(_tables[key], steel_grade, backend=backend)
+
+    chunks = (df for df in partition.read(chunk_size) if len(df.index))
+    store_path = os.path.join(out_dir, partition.name)
+    store = ResultStore.create(store_path)
+    stats = Pipeline(chunks, compute, StoreWriter(store)).run()
+
+    validate = store.get_column('validate')
+    ratio_1 = store.get_column('ratio_1')
+    stats.update({
+        'partition': partition.name,
+        'store': store_path,
+        'worker': f'{socket.gethostname()}:{os.getpid()}',
+        'failed': int(len(validate) - np.count_nonzero(validate)),
+        'max_ratio_1': float(np.nanmax(ratio_1)) if len(ratio_1) else None,
+        'wall': time.perf_counter() - t0
+        })
+
+    return stats
+
+
+class Coordinator:
+    """
+    Interface of the coordinators sending the partitions to the workers.
+
+    submit(function, *args) runs function(*args) on a worker and returns a
+    concurrent.futures.Future with its result.
+    """
+
+    def submit(self, function, *args):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalCoordinator(Coordinator):
+    """Coordinator of a pool of worker processes on this machine."""
+
+    def __init__(self, n_workers=None):
+        """
+        Parameters
+        ----------
+        n_workers : int ; number of worker processes, the number of CPUs by
+                          default.
+        """
+
+        self.n_workers = n_workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(self.n_workers)
+
+    def submit(self, function, *args):
+        return self.executor.submit(function, *args)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class DistributedRun:
+    """
+    Distributed fatigue check of partitions through a coordinator, with the
+    partition results and statistics collected into one result set.
+    """
+
+    def __init__(self, partitions, coordinator, out_dir, db_dir,
+                 steel_grade='S 355', backend='numpy', chunk_size=100_000):
+        """
+        Parameters
+        ----------
+        partitions  : list        ; Partition of the inputs.
+        coordinator : Coordinator ; sends the partitions to the workers.
+        out_dir     : str         ; directory of the result stores.
+        db_dir      : str         ; directory with structural_steel.db and
+                                    sigmaW.db.
+        steel_grade : str         ; steel grade of the material.
+        backend     : str         ; compute backend of the formulae.
+        chunk_size  : int         ; number of rows of every chunk.
+        """
+
+        names = [partition.name for partition in partitions]
+        if len(set(names)) != len(names):
+            raise ValueError('the partitions must have different names')
+
+        self.partitions = partitions
+        self.coordinator = coordinator
+        self.out_dir = out_dir
+        self.db_dir = db_dir
+        self.steel_grade = steel_grade
+        self.backend = backend
+        self.chunk_size = chunk_size
+
+        self.stats = []
+        self.errors = {}
+        self.wall = 0.0
+
+    def run(self):
+        """
+        Run every partition, return the statistics of the partitions in
+        partition order. Raises the first error after all the partitions
+        have finished.
+        """
+
+        t0 = time.perf_counter()
+        os.makedirs(self.out_dir, exist_ok=True)
+        futures = [
+            self.coordinator.submit(
+                run_partition, partition, self.out_dir, self.db_dir,
+                self.steel_grade, self.backend, self.chunk_size
+                )
+            for partition in self.partitions
+            ]
+
+        self.stats = []
+        self.errors = {}
+        for partition, future in zip(self.partitions, futures):
+            try:
+                self.stats.append(future.result())
+            except Exception as e:
+                self.errors[partition.name] = e
+        self.wall = time.perf_counter() - t0
+
+        if self.errors:
+            name, error = next(iter(self.errors.items()))
+            raise RuntimeError(
+                f'{len(self.errors)} partitions failed, first {name}'
+                ) from error
+
+        return self.stats
+
+    def merge(self, path=None, block_size=1_000_000):
+        """
+        Merge the result stores of the partitions, in partition order, into
+        the store path, out_dir/merged by default.
+        """
+
+        path = path or os.path.join(self.out_dir, 'merged')
+        stores = [ResultStore(stats['store']) for stats in self.stats]
+        merged = ResultStore.create(
+            path, sum(store.get_n_rows() for store in stores)
+            )
+
+        start = 0
+        for store in stores:
+            n_rows = store.get_n_rows()
+            for i in range(0, n_rows, block_size):
+                j = min(i + block_size, n_rows)
+                merged.write(start + i, {
+                    name: values[i:j]
+                    for name, values in store.columns.items()
+                    })
+            start += n_rows
+        merged.flush()
+
+        return merged
+
+    def get_summary(self):
+        """Totals of the run over all the partitions."""
+
+        rows = sum(stats['rows'] for stats in self.stats)
+        ratios = [
+            stats['max_ratio_1'] for stats in self.stats
+            if stats['max_ratio_1'] is not None
+            ]
+
+        return {
+            'partitions': len(self.stats),
+            'workers': len({stats['worker'] for stats in self.stats}),
+            'rows': rows,
+            'failed': sum(stats['failed'] for stats in self.stats),
+            'max_ratio_1': max(ratios) if ratios else None,
+            'wall': self.wall,
+            'rows_per_s': rows / self.wall if self.wall else 0.0
+            }
+
+    def get_stats_df(self):
+        """pandas DataFrame with the statistics of every partition."""
+
+        import pandas as pd
+
+        return pd.DataFrame(self.stats).set_index('partition')
+
+
+def main():
+    """Command line entry point of the distributed fatigue check."""
+
+    parser = argparse.ArgumentParser(
+        description='Distributed fatigue check of RSA stresses files.'
+        )
+    parser.add_argument('inputs', nargs='+', help='RSA stresses files')
+    parser.add_argument('--out', required=True, help='output directory')
+    parser.add_argument(
+        '--parts', type=int, default=0,
+        help='partitions by chunk range of every file, one per file if 0'
+        )
+    parser.add_argument('--workers', type=int, default=None)
+    add_arguments(parser)
+    parser.add_argument('--chunk', type=int, default=100_000)
+    parser.add_argument(
+        '--no-merge', action='store_true', help='keep only the partitions'
+        )
+    args = parser.parse_args()
+
+    if args.parts:
+        partitions = [
+            partition for path in args.inputs
+            for partition in partition_chunks(path, args.parts, args.chunk)
+            ]
+    else:
+        partitions = partition_files(args.inputs)
+
+    with LocalCoordinator(args.workers) as coordinator:
+        run = DistributedRun(
+            partitions, coordinator, args.out, os.path.abspath(args.db_dir),
+            args.steel_grade, args.backend, args.chunk
+            )
+        run.run()
+    if not args.no_merge:
+        run.merge()
+
+    print(run.get_stats_df()[['rows', 'failed', 'max_ratio_1', 'wall']])
+    for key, value in run.get_summary().items():
+        print(f'{key:<12}: {value:.3f}' if isinstance(value, float)
+              else f'{key:<12}: {value}')
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Differential equivalence of the fast engines against the reference classes
+
+Created on 19 Oct 2026 10:58
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    python -m packages.equivalence --rows 5000000 --chunk 500000
+
+The reference oracle is PermissibleSigma, PermissibleTau and
+PermissibleStress, run and rounded as in the notebook. Exit status is 1 when
+any engine deviates from the reference.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from .backends import available_backends
+from .check_stress import PermissibleStress
+from .fatigue_kernel import (
+    OUTPUTS, FatigueKernel, empty_results, kernel_inputs
+    )
+from .sigma_permissible_fatigue import PermissibleSigma
+from .tau_permissible_fatigue import PermissibleTau
+from .threaded_fatigue import ThreadedFatigue
+
+
+# Edge values injected in the generated rows.
+EDGE_K = [0.0, -0.0, 1.0, -1.0, np.nan, np.inf, -np.inf, 1.5, -1.5, 0.001]
+EDGE_STRESS = [0.0, -0.0, np.nan, np.inf, -np.inf]
+
+
+def reference(df, sigma_E, sigma_R):
+    """
+    Asumes df has the inputs of the kernel, get the output columns computed
+    and rounded with the classes of the notebook.
+    """
+
+    df = df.copy()
+    permissible_stress = PermissibleSigma(df, sigma_E, sigma_R)
+    df['sigma_tx_[MPa]'] = round(permissible_stress.tension_stress_x(), 1)
+    df['sigma_cx_[MPa]'] = round(permissible_stress.compression_stress_x(), 1)
+    df['sigma_ty_[MPa]'] = round(permissible_stress.tension_stress_y(), 1)
+    df['sigma_cy_[MPa]'] = round(permissible_stress.compression_stress_y(), 1)
+
+    permissible_stress = PermissibleTau(df, sigma_E, sigma_R)
+    df['tau_a_[MPa]'] = round(permissible_stress.shear_stress(), 1)
+
+    stress = PermissibleStress(df)
+    df['sigma_xa_[MPa]'] = round(stress.get_permissible_stress_sx(), 2)
+    df['sigma_ya_[MPa]'] = round(stress.get_permissible_stress_sy(), 2)
+    df['tau_a_[MPa]'] = round(stress.get_permissible_stress_txy(), 2)
+    df['ratio_s_x'] = round(stress.get_ratio_sigma_x(), 2)
+    df['ratio_s_y'] = round(stress.get_ratio_sigma_y(), 2)
+    df['ratio_t_xy'] = round(stress.get_ratio_tau_xy(), 2)
+    df['ratio_1'] = round(stress.get_ratio_1(), 2)
+    df['ratio_2'] = round(stress.get_ratio_2(), 2)
+    df['Validate'] = np.where(
+        (df['ratio_1'] <= 1.0) | (df['ratio_2'] <= 1.05),
+        'yes', 'no'
+        )
+
+    return df
+
+
+def generate(n, seed=0, edge_fraction=0.05):
+    """
+    pandas DataFrame with n rows of kernel inputs: realistic random values
+    and a fraction of edge cases (k = 0, k = ±1, zero max stress, NaN, inf).
+    """
+
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    d = {
+        'sigma_W_[MPa]': rng.uniform(27, 362, n).round(1),
+        'sigma_W0_[MPa]': rng.uniform(84, 250, n).round(1),
+        'k_sx': rng.uniform(-1, 1, n).round(3),
+        'k_sy': rng.uniform(-1, 1, n).round(3),
+        'k_txy': rng.uniform(-1, 1, n).round(3),
+        'sigma_x_max_[MPa]': rng.uniform(-250, 250, n).round(1),
+        'sigma_y_max_[MPa]': rng.uniform(-80, 80, n).round(1),
+        'tau_xy_max_[MPa]': rng.uniform(-60, 60, n).round(2)
+        }
+
+    for col in ('k_sx', 'k_sy', 'k_txy'):
+        rows = rng.random(n) < edge_fraction
+        d[col][rows] = rng.choice(EDGE_K, rows.sum())
+    for col in ('sigma_x_max_[MPa]', 'sigma_y_max_[MPa]', 'tau_xy_max_[MPa]'):
+        rows = rng.random(n) < edge_fraction
+        d[col][rows] = rng.choice(EDGE_STRESS, rows.sum())
+    for col in ('sigma_W_[MPa]', 'sigma_W0_[MPa]'):
+        rows = rng.random(n) < edge_fraction / 10
+        d[col][rows] = np.nan  # Group or notch not in sigmaW.db.
+
+    return pd.DataFrame(d)
+
+
+def kernel_engine(backend):
+    """Engine running the FatigueKernel with the backend."""
+
+    def engine(df, sigma_E, sigma_R):
+        kernel = FatigueKernel(sigma_E, sigma_R, backend)
+        return kernel.run(kernel_inputs(df), empty_results(len(df.index)))
+
+    return engine
+
+
+def threaded_engine(backend):
+    """Engine running ThreadedFatigue with the backend."""
+
+    def engine(df, sigma_E, sigma_R):
+        return ThreadedFatigue(
+            df, sigma_E, sigma_R, block_size=8192, backend=backend
+            ).run()
+
+    return engine
+
+
+def default_engines():
+    """Engines for every available backend, and threaded with NumPy."""
+
+    engines = {name: kernel_engine(name) for name in available_backends()}
+    engines['threaded'] = threaded_engine('numpy')
+
+    return engines
+
+
+class Deviation:
+    """Largest deviation of one output column of one engine."""
+
+    def __init__(self):
+        self.mismatches = 0
+        self.max_deviation = 0.0
+        self.row = None  # Global row of the largest deviation.
+        self.expected = None
+        self.got = None
+
+    def update(self, expected, got, offset):
+        """Compare the expected and got arrays of the rows from offset."""
+
+        if expected.dtype == bool:
+            mismatch = expected != got
+            deviation = mismatch.astype(float)
+        else:
+            same = (expected == got) | (np.isnan(expected) & np.isnan(got))
+            mismatch = ~same
+            with np.errstate(invalid='ignore'):
+                deviation = np.where(
+                    mismatch, np.abs(expected - got), 0.0
+                    )
+            deviation[mismatch & ~np.isfinite(deviation)] = np.inf
+        n = int(mismatch.sum())
+        if not n:
+            return
+        self.mismatches += n
+        i = int(np.argmax(deviation))
+        if self.row is None or deviation[i] > self.max_deviation:
+            self.max_deviation = float(deviation[i])
+            self.row = offset + i
+            self.expected = expected[i].item()
+            self.got = got[i].item()
+
+    def to_dict(self):
+        return {
+            'mismatches': self.mismatches,
+            'max_deviation': self.max_deviation,
+            'row': self.row,
+            'expected': self.expected,
+            'got': self.got
+            }
+
+
+class EquivalenceHarness:
+    """
+    Differential equivalence of fast engines against the reference classes
+    over generated rows, chunk by chunk so millions of rows fit in memory.
+    """
+
+    def __init__(self, sigma_E, sigma_R, engines=None):
+        """
+        Parameters
+        ----------
+        sigma_E : int  ; [MPa] elastic limit of steel.
+        sigma_R : int  ; [MPa] ultimate tensile strength of steel.
+        engines : dict ; callables (df, sigma_E, sigma_R) -> kernel results
+                         by name, every available backend by default.
+        """
+
+        self.sigma_E = sigma_E
+        self.sigma_R = sigma_R
+        self.engines = engines or default_engines()
+
+        self.n_rows = 0
+        self.deviations = {
+            engine: {key: Deviation() for key in OUTPUTS}
+            for engine in self.engines
+            }
+
+    def check(self, df):
+        """Compare the engines against the reference for the rows of df."""
+
+        df = df.reset_index(drop=True)
+        expected = reference(df, self.sigma_E, self.sigma_R)
+        for name, engine in self.engines.items():
+            results = engine(df, self.sigma_E, self.sigma_R)
+            for key, col in OUTPUTS.items():
+                values = expected[col].to_numpy()
+                if key == 'validate':
+                    values = values == 'yes'
+                self.deviations[name][key].update(
+                    values, results[key], self.n_rows
+                    )
+        self.n_rows += len(df.index)
+
+    def run(self, n_rows, chunk_size=500_000, seed=0):
+        """Compare the engines over n_rows generated rows."""
+
+        for i, start in enumerate(range(0, n_rows, chunk_size)):
+            n = min(chunk_size, n_rows - start)
+            self.check(generate(n, seed=seed + i))
+
+        return self.get_report()
+
+    def get_report(self):
+        """Structured report of the deviations of every engine."""
+
+        return {
+            'n_rows': self.n_rows,
+            'engines': {
+                engine: {
+                    key: deviation.to_dict()
+                    for key, deviation in deviations.items()
+                    }
+                for engine, deviations in self.deviations.items()
+                }
+            }
+
+    def is_equivalent(self):
+        """True if no engine deviates from the reference."""
+
+        return not any(
+            deviation.mismatches
+            for deviations in self.deviations.values()
+            for deviation in deviations.values()
+            )
+
+    def print_report(self):
+        """Print the largest deviations and the Validate mismatches."""
+
+        print(f'Rows checked: {self.n_rows}')
+        for engine, deviations in self.deviations.items():
+            validate = deviations['validate'].mismatches
+            worst = max(
+                (d for k, d in deviations.items() if k != 'validate'),
+                key=lambda d: (d.mismatches > 0, d.max_deviation)
+                )
+            key = [k for k, d in deviations.items() if d is worst][0]
+            print(f'\n{engine}')
+            print(f'  Validate mismatches : {validate}')
+            if worst.mismatches:
+                print(f'  Largest deviation   : {worst.max_deviation} in '
+                      f'{OUTPUTS[key]} row {worst.row} '
+                      f'(expected {worst.expected}, got {worst.got})')
+                for k, d in deviations.items():
+                    if d.mismatches and k != 'validate':
+                        print(f'  {OUTPUTS[k]:<16}    : {d.mismatches} rows')
+            else:
+                print('  Largest deviation   : 0')
+
+
+def main():
+    """Command line entry point of the equivalence harness."""
+
+    parser = argparse.ArgumentParser(
+        description='Equivalence of the fast engines with the reference.'
+        )
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk', type=int, default=500_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sigma-E', type=float, default=235)
+    parser.add_argument('--sigma-R', type=float, default=360)
+    args = parser.parse_args()
+
+    harness = EquivalenceHarness(args.sigma_E, args.sigma_R)
+    harness.run(args.rows, args.chunk, args.seed)
+    harness.print_report()
+
+    return 0 if harness.is_equivalent() else 1
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -9,9 +9,6 @@ __version__ = 0.0.0
 __email__ = pbiel@taimweser.com
 """
 
-import pandas as pd
-#import xlsxwriter
-
 
 class ExportExcel:
     """Export pandas DataFrame to Excel."""
@@ -47,6 +44,8 @@ class ExportExcel:
     def export_excel(self):
         """Pandas Excel with multiple DataFrames."""
         
+        import pandas as pd  # Imported here, only when exporting.
+        
         # Create a Pandas Excel writer using XlsxWriter as the engine.
         writer = pd.ExcelWriter('fatigue_check.xlsx', engine='xlsxwriter')
 
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+NumPy kernel for the permissible stresses and the combined stress ratios
+
+Created on 19 Oct 2026 10:52
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import numpy as np
+
+from .backends import Formula, get_backend
+
+
+# Kernel inputs and the DataFrame columns they are read from.
+INPUTS = {
+    'sigma_W': 'sigma_W_[MPa]',
+    'sigma_W0': 'sigma_W0_[MPa]',
+    'k_sx': 'k_sx',
+    'k_sy': 'k_sy',
+    'k_txy': 'k_txy',
+    'sigma_x_max': 'sigma_x_max_[MPa]',
+    'sigma_y_max': 'sigma_y_max_[MPa]',
+    'tau_xy_max': 'tau_xy_max_[MPa]'
+    }
+
+# Kernel outputs and the DataFrame columns they are written to.
+OUTPUTS = {
+    'sigma_tx': 'sigma_tx_[MPa]',
+    'sigma_cx': 'sigma_cx_[MPa]',
+    'sigma_ty': 'sigma_ty_[MPa]',
+    'sigma_cy': 'sigma_cy_[MPa]',
+    'tau_a': 'tau_a_[MPa]',
+    'sigma_xa': 'sigma_xa_[MPa]',
+    'sigma_ya': 'sigma_ya_[MPa]',
+    'ratio_s_x': 'ratio_s_x',
+    'ratio_s_y': 'ratio_s_y',
+    'ratio_t_xy': 'ratio_t_xy',
+    'ratio_1': 'ratio_1',
+    'ratio_2': 'ratio_2',
+    'validate': 'Validate'
+    }
+
+
+def kernel_inputs(df):
+    """
+    Asumes df is the pandas DataFrame of the notebook after the join of
+    sigma_W and sigma_W0, get the contiguous float64 arrays of the kernel.
+
+    Parameters
+    ----------
+    df : pandas DataFrame ; data for the calculation of the stresses for
+                            fatigue.
+    """
+
+    inputs = {}
+    for key, col in INPUTS.items():
+        inputs[key] = np.ascontiguousarray(df[col].to_numpy(dtype=float))
+
+    return inputs
+
+
+def empty_results(n):
+    """Preallocated output arrays of the kernel for n rows."""
+
+    results = {key: np.empty(n) for key in OUTPUTS if key != 'validate'}
+    results['validate'] = np.empty(n, dtype=bool)
+
+    return results
+
+
+def results_to_df(df, results):
+    """
+    Asumes df is the pandas DataFrame of the notebook and results the output
+    arrays of the kernel, get a copy of df with the columns of the notebook.
+    """
+
+    df = df.copy()
+    for key, col in OUTPUTS.items():
+        if key == 'validate':
+            df[col] = np.where(results[key], 'yes', 'no')
+        else:
+            df[col] = results[key]
+
+    return df
+
+
+# Formulae of the permissible stresses, FEM 2131/2132 3-4.5.1.1 and
+# 3-4.5.1.2, as in PermissibleSigma and PermissibleTau.
+_TENSION = [
+    ('sigma_t_neg', 'sigma_W * 5 / (3 - 2 * k)'),
+    ('sigma_t_neg',
+     'where(sigma_t_neg <= sigma_max, sigma_t_neg, sigma_max)'),
+    ('sigma_0', '1.66 * sigma_W'),
+    ('sigma_t_pos', 'sigma_0 / (1 - (1 - sigma_0 / sigma_1) * k)'),
+    ('sigma_t_pos',
+     'where(sigma_t_pos <= sigma_max, sigma_t_pos, sigma_max)')
+    ]
+
+TENSION = Formula(
+    'tension',
+    _TENSION + [('sigma_t', 'where(k <= 0, sigma_t_neg, sigma_t_pos)')],
+    ['sigma_t']
+    )
+
+COMPRESSION = Formula(
+    'compression',
+    _TENSION[2:] + [
+        ('sigma_c_neg', 'sigma_W * 2 / (1 - k)'),
+        ('sigma_c_pos', '1.2 * sigma_t_pos'),
+        ('sigma_c', 'where(k <= 0, sigma_c_neg, sigma_c_pos) * (-1)')
+        ],
+    ['sigma_c']
+    )
+
+SHEAR = Formula(
+    'shear',
+    TENSION.statements + [('tau_a', 'sigma_t / sqrt_3')],
+    ['tau_a']
+    )
+
+# Formulae of the combined stresses, FEM 2131/2132 3-4.5.1.3, as in
+# PermissibleStress.
+COMBINED = Formula(
+    'combined',
+    [
+        ('sigma_xa', 'where(sigma_x_max >= 0, sigma_tx, sigma_cx)'),
+        ('sigma_ya', 'where(sigma_y_max >= 0, sigma_ty, sigma_cy)'),
+        ('ratio_s_x', 'sigma_x_max / sigma_xa'),
+        ('ratio_s_y', 'sigma_y_max / sigma_ya'),
+        ('ratio_t_xy', 'abs(tau_xy_max) / tau_a'),
+        ('ratio_s_xy',
+         'sigma_x_max * sigma_y_max / abs(sigma_xa * sigma_ya)'),
+        ('ratio_1',
+         'ratio_s_x**2 + ratio_s_y**2 - ratio_s_xy + ratio_t_xy**2'),
+        ('ratio_2', 'sqrt(ratio_1)')
+        ],
+    ['sigma_xa', 'sigma_ya', 'ratio_s_x', 'ratio_s_y', 'ratio_t_xy',
+     'ratio_1', 'ratio_2']
+    )
+
+# Chains of the permissible stresses: output, formula, basic stress, k.
+CHAINS = [
+    ('sigma_tx', TENSION, 'sigma_W', 'k_sx'),
+    ('sigma_cx', COMPRESSION, 'sigma_W', 'k_sx'),
+    ('sigma_ty', TENSION, 'sigma_W', 'k_sy'),
+    ('sigma_cy', COMPRESSION, 'sigma_W', 'k_sy'),
+    ('tau_a', SHEAR, 'sigma_W0', 'k_txy')
+    ]
+
+
+class FatigueKernel:
+    """
+    Permissible stresses and combined stress ratios for fatigue according to
+    FEM 2131/2132 over NumPy arrays.
+
+    The formulae are the ones of PermissibleSigma, PermissibleTau and
+    PermissibleStress, with the same operations in the same order, and are
+    evaluated by an interchangeable compute backend (pandas, numpy, numexpr
+    or jit), so the rounded results are the ones of the notebook whatever
+    the backend. Every method works on a block of rows [start:stop] and
+    writes into preallocated output arrays.
+    """
+
+    def __init__(self, sigma_E, sigma_R, backend='numpy', profile=None):
+        """
+        Parameters
+        ----------
+        sigma_E : int           ; [MPa] elastic limit of steel.
+        sigma_R : int           ; [MPa] ultimate tensile strength of steel.
+        backend : str/Backend   ; compute backend of the formulae.
+        profile : KernelProfile ; opt-in profile of the checked rows.
+        """
+
+        self.sigma_E = sigma_E
+        self.sigma_R = sigma_R
+        self.backend = get_backend(backend)
+        self.profile = profile
+
+        self.constants = {
+            'sigma_max': 0.66 * self.sigma_E,  # Clamp of the tension stress.
+            'sigma_1': 0.75 * self.sigma_R,  # Tensile stress for k = +1.
+            'sqrt_3': 3**(0.5)
+            }
+
+    def get_backend(self):
+        """Getter of the compute backend."""
+
+        return self.backend
+
+    def chains(self, inputs, results, start, stop):
+        """
+        Independent chains of the permissible stresses for the rows
+        [start:stop] as (name, callable) pairs; each callable writes its
+        rounded output into results.
+        """
+
+        s = slice(start, stop)
+
+        def chain(key, formula, basic_stress, k):
+            def run():
+                out = results[key][s]
+                variables = dict(self.constants)
+                variables['sigma_W'] = inputs[basic_stress][s]
+                variables['k'] = inputs[k][s]
+                self.backend.evaluate(
+                    formula, variables, {formula.outputs[0]: out}
+                    )
+                np.round(out, 1, out=out)
+            return run
+
+        return [(key, chain(key, *args)) for key, *args in CHAINS]
+
+    def ratios(self, inputs, results, start, stop):
+        """
+        Permissible stresses, stress ratios and validation for the rows
+        [start:stop], from the rounded permissible stresses in results.
+        """
+
+        s = slice(start, stop)
+        variables = {
+            key: inputs[key][s]
+            for key in ('sigma_x_max', 'sigma_y_max', 'tau_xy_max')
+            }
+        for key in ('sigma_tx', 'sigma_cx', 'sigma_ty', 'sigma_cy', 'tau_a'):
+            variables[key] = results[key][s]
+        outs = {key: results[key][s] for key in COMBINED.outputs}
+        self.backend.evaluate(COMBINED, variables, outs)
+
+        for key in ['tau_a'] + COMBINED.outputs:
+            out = results[key][s]
+            np.round(out, 2, out=out)
+
+        validate = results['validate'][s]
+        np.less_equal(results['ratio_1'][s], 1.0, out=validate)
+        validate |= results['ratio_2'][s] <= 1.05
+
+        if self.profile is not None:
+            self.profile.add(self, inputs, results, start, stop)
+
+        return results
+
+    def run(self, inputs, results, start=0, stop=None):
+        """Whole fatigue check of the rows [start:stop], one after another."""
+
+        if stop is None:
+            stop = len(inputs['sigma_W'])
+        for name, chain in self.chains(inputs, results, start, stop):
+            chain()
+        self.ratios(inputs, results, start, stop)
+
+        return results
+
+
+if __name__ == '__main__':
+
+    import pandas as pd
+    import random
+    random.seed(0)
+
+    from .backends import available_backends
+
+    sigma_E = 280
+    sigma_R = 440
+
+    d = {
+        'sigma_W_[MPa]': [random.randint(27, 84) for i in range(5)],
+        'sigma_W0_[MPa]': [random.randint(120, 164) for i in range(5)],
+        'k_sx': [random.uniform(-1, 1) for i in range(5)],
+        'k_sy': [random.uniform(-1, 1) for i in range(5)],
+        'k_txy': [random.uniform(-1, 1) for i in range(5)],
+        'sigma_x_max_[MPa]': [random.randint(-120, 120) for i in range(5)],
+        'sigma_y_max_[MPa]': [random.randint(-40, 40) for i in range(5)],
+        'tau_xy_max_[MPa]': [random.randint(-4, 4) for i in range(5)]
+        }
+    df = pd.DataFrame(d)
+
+    inputs = kernel_inputs(df)
+    for backend in available_backends():
+        results = empty_results(len(df))
+        kernel = FatigueKernel(sigma_E, sigma_R, backend)
+        kernel.run(inputs, results)
+        print(f'\n{backend}')
+        print(results_to_df(df, results)[list(OUTPUTS.values())])
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Ingest of the RSA stresses: schema validation and normalization
+
+Created on 19 Oct 2026 11:05
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import difflib
+
+import numpy as np
+
+from .tables import CATEGORIES, NOTCHES, encode
+
+
+IDS = ['bar', 'node']
+CODES = ['component_group', 'noth_effect']
+KEYS = IDS + CODES
+
+# Extreme stresses, the ones with the higher absolute value first.
+MAXIMA = ['sigma_x_max_[MPa]', 'sigma_y_max_[MPa]', 'tau_xy_max_[MPa]']
+MINIMA = ['sigma_x_min_[MPa]', 'sigma_y_min_[MPa]', 'tau_xy_min_[MPa]']
+STRESSES = MAXIMA + MINIMA
+
+RATIOS_K = ['k_sx', 'k_sy', 'k_txy']
+
+
+class IngestError(ValueError):
+    """Bad input, with every bad row of every check."""
+
+    def __init__(self, errors, n_rows, max_rows=10):
+        """
+        Parameters
+        ----------
+        errors   : dict ; array of bad rows by description of the error.
+        n_rows   : int  ; number of rows of the input.
+        max_rows : int  ; bad rows shown for every error.
+        """
+
+        self.errors = errors
+        self.n_rows = n_rows
+
+        lines = [f'{len(errors)} errors in {n_rows} rows:']
+        for message, rows in errors.items():
+            if rows is None:
+                lines.append(f'  {message}')
+                continue
+            shown = ', '.join(str(row) for row in rows[:max_rows])
+            more = ', ...' if len(rows) > max_rows else ''
+            lines.append(
+                f'  {message}: {len(rows)} rows [{shown}{more}]'
+                )
+        ValueError.__init__(self, '\n'.join(lines))
+
+    def get_bad_rows(self):
+        """Sorted array with every bad row."""
+
+        rows = [r for r in self.errors.values() if r is not None]
+        if not rows:
+            return np.empty(0, dtype=int)
+
+        return np.unique(np.concatenate(rows))
+
+
+def _columns(data):
+    """List with the columns of a pandas DataFrame or a dict of arrays."""
+
+    return list(data.columns) if hasattr(data, 'columns') else list(data)
+
+
+def _numeric(values):
+    """
+    Float array of values and boolean array of the values that are not
+    numbers (missing values are NaN, not errors).
+    """
+
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        return values.astype(float), np.zeros(len(values), dtype=bool)
+
+    import pandas as pd
+
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(
+        dtype=float
+        )
+    missing = pd.isna(pd.Series(values)).to_numpy()
+
+    return numbers, np.isnan(numbers) & ~missing
+
+
+class Ingest:
+    """
+    Validate and normalize the RSA stresses once, before the fatigue check.
+
+    The schema, the dtypes and the component groups and notch effects are
+    checked over the whole input and every bad row is reported in a single
+    IngestError. The stresses are then cast into one contiguous (6, n)
+    array, and the sign flip, the ratios k and the NaN and zero-denominator
+    flags are computed in single NumPy passes over it. Missing stresses are
+    kept as NaN and filled with 0 only in the kernel inputs, as df.fillna(0)
+    in the notebook.
+    """
+
+    def __init__(self, data, rsa_sign=True, ids=IDS):
+        """
+        Asumes data has the columns of the RSA stresses, validate and
+        normalize it.
+
+        Parameters
+        ----------
+        data     : pandas DataFrame or dict ; RSA stresses.
+        rsa_sign : bool                     ; stresses with the sign criterion
+                                              of RSA, compression positive.
+        ids      : list                     ; integer identifiers of the
+                                              points, bar and node.
+        """
+
+        self.data = data
+        self.rsa_sign = rsa_sign
+        self.ids = list(ids)
+        self.validate_schema(data, self.ids)
+        self.n_rows = len(data[CODES[0]])
+
+        errors = {}
+        self.id_values = {
+            col: self.cast_key(data, col, errors) for col in self.ids
+            }
+        self.group = self.encode_key(data, 'component_group', errors)
+        self.notch = self.encode_key(data, 'noth_effect', errors)
+        self.stresses = self.cast_stresses(data, errors)
+        if errors:
+            raise IngestError(errors, self.n_rows)
+
+        if rsa_sign:
+            np.negative(self.stresses, out=self.stresses)
+
+        maxima = self.stresses[:3]
+        minima = self.stresses[3:]
+        self.nan = np.isnan(self.stresses)
+        self.zero_denominator = maxima == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.k = np.round(minima / maxima, 3)
+        self.k[np.isnan(self.k)] = 0  # df.fillna(0) of the notebook.
+        self.maxima = np.where(self.nan[:3], 0.0, maxima)
+
+    @staticmethod
+    def validate_schema(data, ids=IDS):
+        """
+        Raise IngestError for the missing columns and for the columns with
+        another number of rows than the component groups, as the arrays of
+        a dict may have.
+        """
+
+        columns = _columns(data)
+        errors = {}
+        for col in list(ids) + CODES + STRESSES:
+            if col not in columns:
+                close = difflib.get_close_matches(col, columns, n=1)
+                hint = f", found '{close[0]}'" if close else ''
+                errors[f"missing column '{col}'{hint}"] = None
+        if not errors:
+            n_rows = len(data[CODES[0]])
+            for col in list(ids) + CODES + STRESSES:
+                if len(data[col]) != n_rows:
+                    errors[
+                        f"'{col}' has {len(data[col])} rows, not {n_rows}"
+                        ] = None
+        if errors:
+            n_rows = len(data[columns[0]]) if columns else 0
+            raise IngestError(errors, n_rows)
+
+    def cast_key(self, data, col, errors):
+        """Integer array of the key col, bad rows in errors."""
+
+        values, bad = _numeric(data[col])
+        bad |= ~np.isfinite(values)
+        bad[~bad] |= values[~bad] != np.round(values[~bad])
+        if bad.any():
+            errors[f"'{col}' is not an integer"] = np.flatnonzero(bad)
+        values[bad] = 0
+
+        return values.astype('int64')
+
+    def encode_key(self, data, col, errors):
+        """Categorical codes of the key col, bad rows in errors."""
+
+        codes = encode(col, data[col])
+        if (codes < 0).any():
+            errors[
+                f"'{col}' not in {', '.join(CATEGORIES[col])}"
+                ] = np.flatnonzero(codes < 0)
+
+        return codes
+
+    def cast_stresses(self, data, errors):
+        """
+        Contiguous (6, n) float array of the stresses, the bad rows added to
+        errors.
+        """
+
+        if hasattr(data, 'columns') and all(
+                data[col].dtype.kind in 'biuf' for col in STRESSES):
+            stresses = np.ascontiguousarray(
+                data[STRESSES].to_numpy(dtype=float).T
+                )
+        else:
+            stresses = np.empty((len(STRESSES), self.n_rows))
+            for i, col in enumerate(STRESSES):
+                stresses[i], bad = _numeric(data[col])
+                if bad.any():
+                    errors[f"'{col}' is not a number"] = np.flatnonzero(bad)
+        infinite = np.isinf(stresses)
+        for i in np.flatnonzero(infinite.any(axis=1)):
+            errors[f"'{STRESSES[i]}' is infinite"] = np.flatnonzero(
+                infinite[i]
+                )
+
+        return stresses
+
+    def get_flags(self):
+        """
+        Boolean arrays by name: 'nan_<column>' for the missing stresses,
+        filled with 0, and 'zero_<k>' for the ratios k with a zero extreme
+        stress.
+        """
+
+        flags = {}
+        for i, col in enumerate(STRESSES):
+            flags['nan_' + col] = self.nan[i]
+        for i, k in enumerate(RATIOS_K):
+            flags['zero_' + k] = self.zero_denominator[i]
+
+        return flags
+
+    def get_points(self):
+        """
+        Dict with the arrays of the keys, the codes of the component groups
+        and notch effects, and the normalized stresses.
+        """
+
+        points = dict(self.id_values)
+        points['component_group'] = self.group
+        points['noth_effect'] = self.notch
+        for maximum, minimum in zip(MAXIMA, MINIMA):
+            points[maximum] = self.stresses[STRESSES.index(maximum)]
+            points[minimum] = self.stresses[STRESSES.index(minimum)]
+
+        return points
+
+    def get_ratios_k(self):
+        """Dict with the arrays of the ratios k, NaN filled with 0."""
+
+        return dict(zip(RATIOS_K, self.k))
+
+    def get_df(self):
+        """
+        pandas DataFrame with the validated RSA stresses in the sign
+        criterion of the notebook, tension positive.
+
+        The columns, their order, the index and the integer stresses are
+        kept as in the input. With rsa_sign every numeric column but the
+        keys is multiplied by (-1), as in the notebook.
+        """
+
+        import pandas as pd
+
+        points = self.get_points()
+        columns = {}
+        for col in _columns(self.data):
+            values = np.asarray(self.data[col])
+            if col in CODES:
+                values = np.asarray(CATEGORIES[col], dtype=object)[points[col]]
+            elif col in STRESSES and values.dtype.kind in 'iu':
+                values = values.astype('int64')
+                if self.rsa_sign:
+                    values = -values
+            elif col in points:
+                values = points[col]
+            elif col not in KEYS and self.rsa_sign and \
+                    values.dtype.kind in 'iuf':
+                values = -values.astype('int64') \
+                    if values.dtype.kind == 'u' else -values
+            columns[col] = values
+
+        return pd.DataFrame(columns, index=getattr(self.data, 'index', None))
+
+    def kernel_inputs(self, sigma_W):
+        """
+        Input arrays of the FatigueKernel.
+
+        Parameters
+        ----------
+        sigma_W : numpy array ; [group, notch] basic stresses of the steel,
+                                rows and columns as GROUPS and NOTCHES.
+        """
+
+        return {
+            'sigma_W': sigma_W[self.group, self.notch],
+            'sigma_W0': sigma_W[self.group, NOTCHES.index('W0')],
+            'k_sx': self.k[0],
+            'k_sy': self.k[1],
+            'k_txy': self.k[2],
+            'sigma_x_max': self.maxima[0],
+            'sigma_y_max': self.maxima[1],
+            'tau_xy_max': self.maxima[2]
+            }
+
+
+if __name__ == '__main__':
+
+    import pandas as pd
+
+    df = pd.read_excel('xlsx/RSA stresses.xlsx')
+    print(Ingest(df).get_df())
+
+    df.loc[3, 'component_group'] = 'E9'
+    df['sigma_x_max_[MPa]'] = df['sigma_x_max_[MPa]'].astype(object)
+    df.loc[[5, 7], 'sigma_x_max_[MPa]'] = 'n/a'
+    try:
+        Ingest(df)
+    except IngestError as e:
+        print(e)
+
+    try:
+        Ingest(df.rename(columns={'noth_effect': 'notch_effect'}))
+    except IngestError as e:
+        print(e)
@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Pipelined execution overlapping reading, computing and writing
+
+Created on 19 Oct 2026 11:00
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    python -m packages.pipeline "xlsx/RSA stresses.xlsx" results \
+        --steel-grade "S 355" --chunk 100000
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .check_result import CheckResult
+from .fatigue_kernel import FatigueKernel, OUTPUTS
+from .ingest import KEYS, Ingest
+from .prefilter import PreFilter
+from .tables import CATEGORIES, add_arguments, get_tables
+
+_DONE = object()  # End of the chunks in a queue.
+
+
+def read_chunks(path, chunk_size=100_000, start_chunk=0, n_chunks=None):
+    """
+    Generator of pandas DataFrames with chunk_size rows of the RSA stresses
+    file path, .xlsx or .csv, without loading the whole file. The first
+    start_chunk chunks are skipped and, when given, only n_chunks chunks
+    are read.
+    """
+
+    import pandas as pd
+
+    skip = start_chunk * chunk_size
+    stop = None if n_chunks is None else skip + n_chunks * chunk_size
+    if os.path.splitext(path)[1].lower() == '.csv':
+        yield from pd.read_csv(
+            path, chunksize=chunk_size, skiprows=lambda i: 0 < i <= skip,
+            nrows=None if stop is None else stop - skip
+            )
+        return
+
+    import itertools
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        columns = list(next(rows))
+        rows = itertools.islice(rows, skip, stop)
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        wb.close()
+
+
+class FatigueCompute:
+    """
+    Fatigue check of one chunk of RSA stresses: validation and
+    normalization with Ingest, basic stresses and the kernel, as in the
+    notebook.
+    """
+
+    def __init__(self, tables, steel_grade, rsa_sign=True, backend='numpy',
+                 profile=None, prefilter=False):
+        """
+        Parameters
+        ----------
+        tables      : Tables        ; material and basic stress tables.
+        steel_grade : str           ; steel grade of the material.
+        rsa_sign    : bool          ; stresses with the sign criterion of
+                                      RSA, compression positive.
+        backend     : str           ; compute backend of the formulae.
+        profile     : KernelProfile ; opt-in profile of the checked rows.
+        prefilter   : bool          ; screen the points that obviously pass
+                                      with PreFilter; they get the lowest
+                                      permissible stresses, upper bounds of
+                                      the ratios and the column screened
+                                      True, and skip the kernel profile.
+        """
+
+        self.tables = tables
+        self.steel_grade = steel_grade
+        self.rsa_sign = rsa_sign
+        self.profile = profile
+
+        kernel = tables.get_kernel(steel_grade)
+        self.kernel = FatigueKernel(
+            kernel.sigma_E, kernel.sigma_R, backend, profile
+            )
+        self.prefilter = PreFilter(kernel.sigma_E, kernel.sigma_R) \
+            if prefilter else None
+
+    def get_settings(self):
+        """Settings of the check, recorded by the checkpoints."""
+
+        return {
+            'steel_grade': self.steel_grade,
+            'rsa_sign': self.rsa_sign,
+            'backend': self.kernel.get_backend().name,
+            'prefilter': self.prefilter is not None
+            }
+
+    def check(self, df, layout='columns'):
+        """
+        CheckResult of the chunk df, the kernel writing into its buffers.
+
+        Parameters
+        ----------
+        df     : pandas DataFrame ; chunk of RSA stresses.
+        layout : str              ; 'records' or 'columns', see CheckResult.
+        """
+
+        ingest = Ingest(df, self.rsa_sign)
+        if self.profile is not None:
+            self.profile.add_ingest(ingest)
+        inputs = ingest.kernel_inputs(
+            self.tables.get_sigma_W(self.steel_grade)
+            )
+        result = CheckResult(ingest.n_rows, layout)
+        columns = result.get_columns()
+        points = ingest.get_points()
+        for key in KEYS:
+            columns[key][:] = points[key]
+        for key in ('sigma_x_max', 'sigma_y_max', 'tau_xy_max'):
+            columns[key][:] = inputs[key]
+        if self.prefilter is None:
+            self.kernel.run(inputs, result.get_outputs())
+            columns['screened'][:] = False
+        else:
+            columns['screened'][:] = self.prefilter.run(
+                self.kernel, inputs, result.get_outputs()
+                )[1]
+
+        return result
+
+    def __call__(self, df):
+        """Columns of the result store for the chunk df."""
+
+        return self.check(df).get_columns()
+
+
+class StoreWriter:
+    """Append the chunks to a ResultStore."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __call__(self, columns):
+        self.store.append(columns)
+
+    def close(self):
+        self.store.flush()
+
+
+class XlsxWriter:
+    """
+    Write the chunks to Excel sheets row by row, with the constant memory
+    mode of xlsxwriter.
+
+    NaN results are written as blank cells, as ExportExcel, and infinite
+    ones as Excel errors. A full sheet, 1 048 576 rows, continues in a new
+    sheet 'fatigue check 2', 'fatigue check 3', ...
+    """
+
+    max_rows = 1_048_576  # Rows of an Excel sheet.
+
+    def __init__(self, path, screened=False):
+        """
+        Parameters
+        ----------
+        path     : str  ; Excel file.
+        screened : bool ; add the column Screened of the PreFilter.
+        """
+
+        import xlsxwriter
+
+        self.wb = xlsxwriter.Workbook(
+            path, {'constant_memory': True, 'nan_inf_to_errors': True}
+            )
+        self.columns = KEYS + [
+            'sigma_x_max', 'sigma_y_max', 'tau_xy_max'
+            ] + list(OUTPUTS)
+        self.header = KEYS + [
+            'sigma_x_max_[MPa]', 'sigma_y_max_[MPa]', 'tau_xy_max_[MPa]'
+            ] + list(OUTPUTS.values())
+        if screened:
+            self.columns.append('screened')
+            self.header.append('Screened')
+        self.n_sheets = 0
+        self.add_sheet()
+
+    def add_sheet(self):
+        """Add a sheet with the header and write the next rows in it."""
+
+        self.n_sheets += 1
+        name = 'fatigue check'
+        if self.n_sheets > 1:
+            name += f' {self.n_sheets}'
+        self.ws = self.wb.add_worksheet(name)
+        self.ws.write_row(0, 0, self.header)
+        self.row = 1
+
+    def __call__(self, columns):
+        values = []
+        for key in self.columns:
+            if key in CATEGORIES:  # Codes of Ingest.
+                values.append(
+                    [CATEGORIES[key][code] for code in columns[key]]
+                    )
+            elif columns[key].dtype.kind == 'f':
+                column = columns[key].astype(object)
+                column[np.isnan(columns[key])] = None  # Blank cell.
+                values.append(column.tolist())
+            else:
+                values.append(columns[key].tolist())
+        for key in ('validate', 'screened'):
+            if key in self.columns:
+                i = self.columns.index(key)
+                values[i] = ['yes' if v else 'no' for v in values[i]]
+        for row in zip(*values):
+            if self.row == self.max_rows:
+                self.add_sheet()
+            if self.ws.write_row(self.row, 0, row) == -1:
+                raise RuntimeError(
+                    f'row {self.row} not written in {self.ws.name}'
+                    )
+            self.row += 1
+
+    def close(self):
+        self.wb.close()
+
+
+class Pipeline:
+    """
+    Pipelined executor: a background thread reads chunk n+1 and another
+    writes chunk n-1 while chunk n is computed.
+
+    The queues between the stages are bounded, so a slow stage blocks the
+    ones before it and the memory holds at most about 2 * maxsize + 3
+    chunks. The wall time approaches the time of the slowest stage instead
+    of the sum of the three.
+    """
+
+    def __init__(self, chunks, compute, write, maxsize=2):
+        """
+        Parameters
+        ----------
+        chunks  : iterable ; chunks of input, pandas DataFrames.
+        compute : callable ; chunk -> columns of the results.
+        write   : callable ; writes the columns of one chunk, with a
+                             close() method called at the end.
+        maxsize : int      ; chunks waiting between two stages.
+        """
+
+        self.chunks = chunks
+        self.compute = compute
+        self.write = write
+        self.maxsize = maxsize
+
+        self.stop = threading.Event()
+        self.errors = []
+        self.times = {'read': 0.0, 'compute': 0.0, 'write': 0.0}
+        self.n_chunks = 0
+        self.n_rows = 0
+
+    def put(self, q, item):
+        """Put item in q, unless the pipeline is stopping."""
+
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def get(self, q):
+        """Next item of q, _DONE when the pipeline is stopping."""
+
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        return _DONE
+
+    def reader(self, q):
+        """Read the chunks into q."""
+
+        try:
+            chunks = iter(self.chunks)
+            while True:
+                t = time.perf_counter()
+                chunk = next(chunks, _DONE)
+                self.times['read'] += time.perf_counter() - t
+                if chunk is _DONE or not self.put(q, chunk):
+                    break
+        except BaseException as e:
+            self.errors.append(e)
+            self.stop.set()
+        finally:
+            self.put(q, _DONE)
+
+    def writer(self, q):
+        """Write the results from q."""
+
+        try:
+            while True:
+                columns = self.get(q)
+                if columns is _DONE:
+                    break
+                t = time.perf_counter()
+                self.write(columns)
+                self.times['write'] += time.perf_counter() - t
+        except BaseException as e:
+            self.errors.append(e)
+            self.stop.set()
+
+    def run(self):
+        """Run the pipeline, return its statistics."""
+
+        t0 = time.perf_counter()
+        q_in = queue.Queue(self.maxsize)
+        q_out = queue.Queue(self.maxsize)
+        threads = [
+            threading.Thread(target=self.reader, args=(q_in,), daemon=True),
+            threading.Thread(target=self.writer, args=(q_out,), daemon=True)
+            ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                chunk = self.get(q_in)
+                if chunk is _DONE:
+                    break
+                t = time.perf_counter()
+                columns = self.compute(chunk)
+                self.times['compute'] += time.perf_counter() - t
+                self.n_chunks += 1
+                self.n_rows += len(chunk.index)
+                if not self.put(q_out, columns):
+                    break
+        except BaseException as e:
+            self.errors.append(e)
+            self.stop.set()
+        finally:
+            self.put(q_out, _DONE)
+            for thread in threads:
+                thread.join()
+            if not self.errors:
+                self.write.close()
+
+        if self.errors:
+            raise self.errors[0]
+
+        return self.get_stats(time.perf_counter() - t0)
+
+    def get_stats(self, wall):
+        """Statistics of the run."""
+
+        return {
+            'chunks': self.n_chunks,
+            'rows': self.n_rows,
+            'wall': wall,
+            **self.times
+            }
+
+
+def main():
+    """Command line entry point of the pipelined fatigue check."""
+
+    from .profiler import KernelProfile
+    from .result_store import ResultStore
+
+    parser = argparse.ArgumentParser(
+        description='Pipelined fatigue check of an RSA stresses file.'
+        )
+    parser.add_argument('input', help='RSA stresses, .xlsx or .csv')
+    parser.add_argument(
+        'output', help='result store directory, or .xlsx file'
+        )
+    add_arguments(parser)
+    parser.add_argument('--chunk', type=int, default=100_000)
+    parser.add_argument('--profile', help='JSON file of the kernel profile')
+    parser.add_argument(
+        '--prefilter', action='store_true',
+        help='screen the points that obviously pass, see PreFilter'
+        )
+    args = parser.parse_args()
+
+    profile = KernelProfile() if args.profile else None
+    compute = FatigueCompute(
+        get_tables(args), args.steel_grade, backend=args.backend,
+        profile=profile, prefilter=args.prefilter
+        )
+    if args.output.lower().endswith('.xlsx'):
+        write = XlsxWriter(args.output, args.prefilter)
+    else:
+        write = StoreWriter(ResultStore.create(args.output))
+    stats = Pipeline(read_chunks(args.input, args.chunk), compute, write).run()
+    if profile is not None:
+        profile.to_json(args.profile)
+
+    for key, value in stats.items():
+        print(f'{key:<8}: {value:.3f}' if isinstance(value, float)
+              else f'{key:<8}: {value}')
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Conservative pre-filter of the points that obviously pass the fatigue check
+
+Created on 19 Oct 2026 10:59
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+For -1 ≤ k ≤ 1 the permissible stresses of PermissibleSigma are bounded
+from below by the lowest permissible stress over all k:
+
+    sigma_t ≥ min(sigma_W, 0.75 * sigma_R, 0.66 * sigma_E)
+    |sigma_c| ≥ min(sigma_W, 0.75 * sigma_R, 0.66 * sigma_E)
+    tau_a ≥ min(sigma_W0, 0.75 * sigma_R, 0.66 * sigma_E) / sqrt(3)
+
+(k = -1 gives sigma_W, k > 0 lies between sigma_0 = 1.66 * sigma_W and
+sigma_+1 = 0.75 * sigma_R, and both are clamped to 0.66 * sigma_E.) With
+u = |stress| / lowest permissible stress, the combined ratio of formula (5)
+is bounded by
+
+    ratio_1 ≤ u_x**2 + u_y**2 + u_x * u_y + u_t**2
+
+whatever the signs of sigma_x_max and sigma_y_max, so a point whose bound is
+≤ 1 passes (ratio_1 ≤ 1.0) without the exact check.
+
+Only the points not screened are copied out and run through the kernel.
+The screened points get the lowest permissible stresses, rounded as the
+exact ones, and the bounds u and ratio_1 ≤ 1 rounded up to 0.01: finite
+upper bounds of the exact ratios, with Validate True.
+"""
+
+import numpy as np
+
+from .fatigue_kernel import empty_results
+
+
+class PreFilter:
+    """
+    Cheap vectorized screening of the points that pass the fatigue check.
+
+    The screening never passes a point that the exact check rejects: it
+    uses the lowest permissible stresses, discounts the rounding of the
+    permissible stresses to 0.1 MPa and leaves to the exact check every
+    point with k outside [-1, 1] or with non-finite values.
+    """
+
+    def __init__(self, sigma_E, sigma_R, threshold=1.0, margin=0.06,
+                 min_screened=0.5):
+        """
+        Parameters
+        ----------
+        sigma_E      : int   ; [MPa] elastic limit of steel.
+        sigma_R      : int   ; [MPa] ultimate tensile strength of steel.
+        threshold    : float ; highest bound of ratio_1 of a screened point.
+        margin       : float ; [MPa] discount of the lowest permissible
+                               stresses for their rounding to 0.1 MPa.
+        min_screened : float ; lowest fraction of screened points worth the
+                               split of the rows; with fewer, run() checks
+                               every point exactly.
+        """
+
+        self.sigma_E = sigma_E
+        self.sigma_R = sigma_R
+        self.threshold = threshold
+        self.margin = margin
+        self.min_screened = min_screened
+
+        self.sigma_limit = min(0.75 * self.sigma_R, 0.66 * self.sigma_E)
+
+    def lowest_permissible(self, sigma_W):
+        """Lowest permissible normal stress over all k for sigma_W."""
+
+        return np.minimum(sigma_W, self.sigma_limit)
+
+    def lowest_permissible_shear(self, sigma_W0):
+        """Lowest permissible shear stress over all k for sigma_W0."""
+
+        return self.lowest_permissible(sigma_W0) / 3**(0.5)
+
+    def get_table(self, df_sW):
+        """
+        pandas DataFrame with the lowest permissible stress over all k for
+        every component group and notch effect of df_sW, the table of the
+        steel in sigmaW.db, and tau_a for the shear in column tau_a.
+        """
+
+        df = df_sW.set_index('component_group').astype(float)
+        table = df.clip(upper=self.sigma_limit)
+        table['tau_a'] = self.lowest_permissible_shear(df['W0'])
+
+        return table
+
+    def bounds(self, inputs):
+        """
+        Lowest permissible stresses, 'sigma' and 'tau', upper bounds of the
+        stress ratios and upper bound of ratio_1 of every point, NaN if not
+        screenable.
+        """
+
+        sigma = self.lowest_permissible(inputs['sigma_W'])
+        tau = self.lowest_permissible_shear(inputs['sigma_W0'])
+        sigma_a = sigma - self.margin
+        tau_a = tau - self.margin
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u_x = np.abs(inputs['sigma_x_max'])
+            u_x /= sigma_a
+            u_y = np.abs(inputs['sigma_y_max'])
+            u_y /= sigma_a
+            u_t = np.abs(inputs['tau_xy_max'])
+            u_t /= tau_a
+            bound = u_x + u_y  # u_x**2 + u_y**2 + u_x * u_y + u_t**2
+            bound *= bound
+            bound -= u_x * u_y
+            bound += u_t * u_t
+
+        valid = (sigma_a > 0) & (tau_a > 0) & np.isfinite(bound)
+        for key in ('k_sx', 'k_sy', 'k_txy'):
+            valid &= np.abs(inputs[key]) <= 1  # False for NaN.
+        np.copyto(bound, np.nan, where=~valid)
+
+        return {
+            'sigma': sigma,
+            'tau': tau,
+            'ratio_s_x': u_x,
+            'ratio_s_y': u_y,
+            'ratio_t_xy': u_t,
+            'ratio_1': bound
+            }
+
+    def bound(self, inputs):
+        """Upper bound of ratio_1 for every point, NaN if not screenable."""
+
+        return self.bounds(inputs)['ratio_1']
+
+    def screen(self, inputs):
+        """Boolean array, True for the points that obviously pass."""
+
+        return self.bound(inputs) <= self.threshold
+
+    def fill(self, inputs, bounds, results):
+        """
+        Write into results the outputs of every point as a screened one:
+        the lowest permissible stresses, rounded as the exact ones, the
+        upper bounds of the ratios, rounded up to 0.01, and Validate True.
+        Whole arrays in place, cheaper than selecting the screened rows.
+        """
+
+        sigma = results['sigma_tx']
+        np.round(bounds['sigma'], 1, out=sigma)
+        np.copyto(results['sigma_ty'], sigma)
+        np.negative(sigma, out=results['sigma_cx'])
+        np.copyto(results['sigma_cy'], results['sigma_cx'])
+        np.round(bounds['tau'], 1, out=results['tau_a'])
+        for key, stress in (('sigma_xa', 'sigma_x_max'),
+                            ('sigma_ya', 'sigma_y_max')):
+            np.copyto(results[key], results['sigma_cx'])
+            np.copyto(results[key], sigma, where=inputs[stress] >= 0)
+
+        np.sqrt(bounds['ratio_1'], out=results['ratio_2'])
+        for key in ('ratio_s_x', 'ratio_s_y', 'ratio_t_xy', 'ratio_1',
+                    'ratio_2'):
+            out = results[key]
+            values = out if key == 'ratio_2' else bounds[key]
+            np.multiply(values, 100, out=out)
+            np.ceil(out, out=out)
+            out /= 100
+        results['validate'][:] = True
+
+        return results
+
+    def run(self, kernel, inputs, results=None):
+        """
+        Asumes kernel is the FatigueKernel of the steel, run the exact check
+        only for the points not screened and fill the outputs of the
+        screened ones with their bounds.
+
+        Returns the output arrays of the kernel, written into results when
+        given, and the boolean array of the screened points, all False when
+        fewer than min_screened of them pass the screening.
+        """
+
+        bounds = self.bounds(inputs)
+        screened = bounds['ratio_1'] <= self.threshold
+        n = len(screened)
+        if results is None:
+            results = empty_results(n)
+
+        candidates = np.flatnonzero(~screened)
+        if n - len(candidates) <= self.min_screened * n:
+            kernel.run(inputs, results)
+            return results, np.zeros(n, dtype=bool)
+
+        self.fill(inputs, bounds, results)
+        if len(candidates):
+            exact = empty_results(len(candidates))
+            kernel.run(
+                {key: values[candidates] for key, values in inputs.items()},
+                exact
+                )
+            for key, values in exact.items():
+                results[key][candidates] = values
+
+        return results, screened
+
+
+if __name__ == '__main__':
+
+    import time
+
+    from .equivalence import generate, reference
+    from .fatigue_kernel import FatigueKernel, kernel_inputs
+
+    sigma_E = 235
+    sigma_R = 360
+
+    kernel = FatigueKernel(sigma_E, sigma_R)
+    prefilter = PreFilter(sigma_E, sigma_R)
+    df = generate(1_000_000, edge_fraction=0.01)
+
+    # Exact check against pre-filter with utilizations 1/1, 1/4 and 1/20
+    # of the generated ones, the best time of three runs.
+    for scale in (1, 4, 20):
+        scaled = df.copy()
+        for col in ('sigma_x_max_[MPa]', 'sigma_y_max_[MPa]',
+                    'tau_xy_max_[MPa]'):
+            scaled[col] /= scale
+        inputs = kernel_inputs(scaled)
+        results = empty_results(len(df))
+
+        times = []
+        for run in (lambda: kernel.run(inputs, results),
+                    lambda: prefilter.run(kernel, inputs, results)):
+            best = float('inf')
+            for i in range(3):
+                t0 = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - t0)
+            times.append(best)
+        screened = prefilter.screen(inputs)
+        expected = reference(scaled, sigma_E, sigma_R)['Validate']
+        wrong = int(((expected.to_numpy() != 'yes') & screened).sum())
+
+        print(f'\nstresses / {scale}')
+        print(f'screenable  : {screened.mean():.1%}')
+        print(f'exact       : {times[0]:.3f} s')
+        print(f'pre-filter  : {times[1]:.3f} s')
+        print(f'speed-up    : {times[0] / times[1]:.2f}')
+        print(f'wrong passes: {wrong}')
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Opt-in profile of the branches, clamps and values of the fatigue check
+
+Created on 19 Oct 2026 11:13
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    profile = KernelProfile()
+    kernel = FatigueKernel(sigma_E, sigma_R, profile=profile)
+    kernel.run(inputs, results)
+    profile.to_json('profile.json')
+
+    python -m packages.pipeline "xlsx/RSA stresses.xlsx" results \
+        --profile profile.json
+
+The profile counts how the rows split over the code paths of the formulae:
+k ≤ 0, k > 0 or NaN, which partition the rows (NaN rows take the k > 0
+branch of where() in the formulae, but are only counted as NaN), the
+active 0.66 * sigma_E clamps, the zero denominators of k (zero or missing
+extreme stresses) and of the stress ratios and, when the rows come through
+Ingest, the distribution over component groups and notch effects, with
+fixed-bin histograms of k and of the ratios.
+"""
+
+import json
+import threading
+
+import numpy as np
+
+from .backends import Formula, get_backend
+from .fatigue_kernel import _TENSION
+from .tables import GROUPS, NOTCHES
+
+
+# Active clamps of the tension formula, 1.0 where the permissible stress of
+# the branch of k is replaced by sigma_max, with the statements of TENSION.
+CLAMP = Formula(
+    'clamp',
+    [_TENSION[0]] + _TENSION[2:4] + [
+        ('clamp_neg', 'where(sigma_t_neg <= sigma_max, 0.0, 1.0)'),
+        ('clamp_pos', 'where(sigma_t_pos <= sigma_max, 0.0, 1.0)'),
+        ('clamp', 'where(k <= 0, clamp_neg, clamp_pos)')
+        ],
+    ['clamp']
+    )
+
+# Tension chains of the kernel: output, basic stress, k.
+TENSION_CHAINS = [
+    ('sigma_tx', 'sigma_W', 'k_sx'),
+    ('sigma_ty', 'sigma_W', 'k_sy'),
+    ('tau_a', 'sigma_W0', 'k_txy')
+    ]
+
+# Stress ratios and their denominators.
+DENOMINATORS = {
+    'ratio_s_x': 'sigma_xa',
+    'ratio_s_y': 'sigma_ya',
+    'ratio_t_xy': 'tau_a'
+    }
+
+RATIOS_K = ['k_sx', 'k_sy', 'k_txy']
+
+# Ratios k and their denominators, the extreme stresses.
+MAXIMA = {
+    'k_sx': 'sigma_x_max',
+    'k_sy': 'sigma_y_max',
+    'k_txy': 'tau_xy_max'
+    }
+
+
+class Histogram:
+    """Histogram with fixed bins, and counts below, above and NaN."""
+
+    def __init__(self, low, high, bins):
+        """
+        Parameters
+        ----------
+        low  : float ; lower edge of the first bin.
+        high : float ; upper edge of the last bin.
+        bins : int   ; number of bins.
+        """
+
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype='int64')
+        self.below = 0
+        self.above = 0
+        self.nan = 0
+
+    def add(self, values):
+        """Add the values of an array."""
+
+        nan = np.isnan(values)
+        self.nan += int(nan.sum())
+        values = values[~nan]
+        self.below += int((values < self.edges[0]).sum())
+        self.above += int((values > self.edges[-1]).sum())
+        self.counts += np.histogram(values, self.edges)[0]
+
+    def to_dict(self):
+        return {
+            'edges': self.edges.tolist(),
+            'counts': self.counts.tolist(),
+            'below': self.below,
+            'above': self.above,
+            'nan': self.nan
+            }
+
+
+class KernelProfile:
+    """
+    Branch counters and value histograms of the rows checked by a
+    FatigueKernel, collected after every block of rows.
+
+    Blocks of several threads are added under a lock, so one profile can
+    follow a ThreadedFatigue run. The counters cost a few vectorized
+    passes over the block, and nothing when no profile is given.
+    """
+
+    def __init__(self, k_bins=20, ratio_bins=40, ratio_max=2.0):
+        """
+        Parameters
+        ----------
+        k_bins     : int   ; bins of the histograms of k over [-1, 1].
+        ratio_bins : int   ; bins of the histograms of the ratios.
+        ratio_max  : float ; upper edge of the histograms of the ratios.
+        """
+
+        self.lock = threading.Lock()
+        self.backend = get_backend('numpy')
+
+        self.rows = 0
+        self.branches = {
+            k: {'k<=0': 0, 'k>0': 0, 'nan': 0, 'inf': 0} for k in RATIOS_K
+            }
+        self.clamps = {key: 0 for key, *_ in TENSION_CHAINS}
+        self.zero_denominators = {
+            key: 0 for key in RATIOS_K + list(DENOMINATORS)
+            }
+        self.non_finite = {
+            key: 0 for key in list(DENOMINATORS) + ['ratio_1', 'ratio_2']
+            }
+        self.validate = {'yes': 0, 'no': 0}
+        self.groups = np.zeros((len(GROUPS), len(NOTCHES)), dtype='int64')
+        self.ingested = False  # Groups only known through add_ingest.
+        self.histograms = {k: Histogram(-1, 1, k_bins) for k in RATIOS_K}
+        for key in ('ratio_1', 'ratio_2'):
+            self.histograms[key] = Histogram(0, ratio_max, ratio_bins)
+
+    def add(self, kernel, inputs, results, start, stop):
+        """
+        Asumes kernel has checked the rows [start:stop], add them to the
+        profile.
+        """
+
+        s = slice(start, stop)
+        counts = {}
+        for key in RATIOS_K:
+            k = inputs[key][s]
+            counts[key] = {
+                'k<=0': int(np.count_nonzero(k <= 0)),
+                'k>0': int(np.count_nonzero(k > 0)),
+                'nan': int(np.count_nonzero(np.isnan(k))),
+                'inf': int(np.count_nonzero(np.isinf(k)))
+                }
+
+        clamps = {}
+        clamp = np.empty(stop - start)
+        for key, basic_stress, k in TENSION_CHAINS:
+            variables = dict(kernel.constants)
+            variables['sigma_W'] = inputs[basic_stress][s]
+            variables['k'] = inputs[k][s]
+            self.backend.evaluate(CLAMP, variables, {'clamp': clamp})
+            clamps[key] = int(clamp.sum())
+
+        zeros = {
+            k: int(np.count_nonzero(inputs[maximum][s] == 0))
+            for k, maximum in MAXIMA.items()
+            }
+        zeros.update({
+            ratio: int(np.count_nonzero(results[denominator][s] == 0))
+            for ratio, denominator in DENOMINATORS.items()
+            })
+        non_finite = {
+            key: int(np.count_nonzero(~np.isfinite(results[key][s])))
+            for key in self.non_finite
+            }
+        passed = int(np.count_nonzero(results['validate'][s]))
+
+        with self.lock:
+            self.rows += stop - start
+            for key, branch in counts.items():
+                for name, n in branch.items():
+                    self.branches[key][name] += n
+                self.histograms[key].add(inputs[key][s])
+            for key, n in clamps.items():
+                self.clamps[key] += n
+            for key, n in zeros.items():
+                self.zero_denominators[key] += n
+            for key, n in non_finite.items():
+                self.non_finite[key] += n
+            for key in ('ratio_1', 'ratio_2'):
+                self.histograms[key].add(results[key][s])
+            self.validate['yes'] += passed
+            self.validate['no'] += stop - start - passed
+
+    def add_ingest(self, ingest):
+        """
+        Add the component groups and notch effects of an Ingest, which the
+        kernel does not see.
+        """
+
+        groups = np.bincount(
+            ingest.group.astype('int64') * len(NOTCHES) + ingest.notch,
+            minlength=self.groups.size
+            ).reshape(self.groups.shape)
+
+        with self.lock:
+            self.groups += groups
+            self.ingested = True
+
+    def get_profile(self):
+        """Structured profile, a dict of plain Python values."""
+
+        with self.lock:
+            return {
+                'rows': self.rows,
+                'branches': {k: dict(v) for k, v in self.branches.items()},
+                'clamps': dict(self.clamps),
+                'zero_denominators': dict(self.zero_denominators),
+                'non_finite': dict(self.non_finite),
+                'validate': dict(self.validate),
+                'groups': {
+                    group: {
+                        notch: int(self.groups[i, j])
+                        for j, notch in enumerate(NOTCHES)
+                        if self.groups[i, j]
+                        }
+                    for i, group in enumerate(GROUPS)
+                    if self.groups[i].any()
+                    } if self.ingested else None,
+                'histograms': {
+                    key: histogram.to_dict()
+                    for key, histogram in self.histograms.items()
+                    }
+                }
+
+    def to_json(self, path=None):
+        """JSON of the profile, written to path when given."""
+
+        text = json.dumps(self.get_profile(), indent=1)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+
+        return text
+
+
+if __name__ == '__main__':
+
+    from .equivalence import generate
+    from .fatigue_kernel import FatigueKernel, empty_results, kernel_inputs
+
+    df = generate(100_000)
+    profile = KernelProfile()
+    kernel = FatigueKernel(235, 360, profile=profile)
+    kernel.run(kernel_inputs(df), empty_results(len(df.index)))
+
+    report = profile.get_profile()
+    for key in ('rows', 'branches', 'clamps', 'zero_denominators',
+                'non_finite', 'validate'):
+        print(f'{key:<18}: {report[key]}')
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Vectorized diff of the fatigue results of two model revisions
+
+Created on 19 Oct 2026 11:10
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+
+Usage:
+
+    python -m packages.result_diff results_rev_A results_rev_B --top 20
+
+A point (bar, node) may have several rows, so every revision is reduced to
+the governing values of every point first: the highest ratios and
+utilization and Validate only if all its rows pass. The utilization
+
+    u = min(ratio_1, ratio_2 / 1.05)
+
+is ≤ 1 exactly when the point passes, so its delta measures how far a
+point moved towards or away from the limit.
+"""
+
+import argparse
+
+import numpy as np
+
+from .result_store import COLUMNS, ResultStore
+
+
+RATIOS = ['ratio_1', 'ratio_2', 'utilization']
+
+
+def _key(bar, node):
+    """
+    int64 key of (bar, node), ordered by bar and then by node. Raises
+    OverflowError for bars or nodes out of the int32 range.
+    """
+
+    info = np.iinfo('int32')
+    for name, values in (('bar', bar), ('node', node)):
+        if len(values) and (
+                values.min() < info.min or values.max() > info.max):
+            raise OverflowError(f"'{name}' out of the range of the diff keys")
+
+    return (bar.astype('int64') << 32) | (node.astype('int64') & 0xFFFFFFFF)
+
+
+def governing(store):
+    """
+    Asumes store is a ResultStore, get the sorted keys of its points and
+    the governing ratios and Validate of every point. Only the columns
+    needed are read from the memory-mapped files.
+    """
+
+    key = _key(
+        np.asarray(store.get_column('bar')),
+        np.asarray(store.get_column('node'))
+        )
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) \
+        else np.empty(0, dtype='int64')  # No points in an empty store.
+
+    ratio_1, ratio_2 = [
+        np.round(np.asarray(store.get_column(name), dtype=float)[order],
+                 COLUMNS[name][2])  # float32 back to the rounded values.
+        for name in ('ratio_1', 'ratio_2')
+        ]
+    validate = np.asarray(store.get_column('validate'))[order]
+    utilization = np.fmin(ratio_1, ratio_2 / 1.05)
+    values = {}
+    for name, row_values in zip(RATIOS, (ratio_1, ratio_2, utilization)):
+        if len(key):
+            values[name] = np.fmax.reduceat(row_values, starts)
+        else:
+            values[name] = row_values
+    values['validate'] = np.logical_and.reduceat(validate, starts) \
+        if len(key) else validate
+
+    return key[starts], values
+
+
+class ResultDiff:
+    """
+    Diff of the fatigue results of two revisions, a and b, aligned on
+    (bar, node) with a sort-merge join of the governing values.
+    """
+
+    def __init__(self, store_a, store_b):
+        """
+        Parameters
+        ----------
+        store_a : ResultStore or str ; results of the old revision.
+        store_b : ResultStore or str ; results of the new revision.
+        """
+
+        if isinstance(store_a, str):
+            store_a = ResultStore(store_a)
+        if isinstance(store_b, str):
+            store_b = ResultStore(store_b)
+
+        key_a, self.a = governing(store_a)
+        key_b, self.b = governing(store_b)
+
+        # Sort-merge join of the sorted unique keys.
+        pos = np.searchsorted(key_b, key_a)
+        pos = np.minimum(pos, max(len(key_b) - 1, 0))
+        common_a = (key_b[pos] == key_a) if len(key_b) else \
+            np.zeros(len(key_a), dtype=bool)
+        common_b = np.zeros(len(key_b), dtype=bool)
+        common_b[pos[common_a]] = True
+
+        self.index_a = np.flatnonzero(common_a)
+        self.index_b = pos[common_a]
+        self.key = key_a[common_a]
+        self.removed = key_a[~common_a]
+        self.added = key_b[~common_b]
+
+        self.deltas = {
+            name: self.b[name][self.index_b] - self.a[name][self.index_a]
+            for name in RATIOS
+            }
+        pass_a = self.a['validate'][self.index_a]
+        pass_b = self.b['validate'][self.index_b]
+        self.new_failures = pass_a & ~pass_b
+        self.new_passes = ~pass_a & pass_b
+
+    def get_bar_node(self, key):
+        """Arrays of bars and nodes of the keys."""
+
+        return key >> 32, (key & 0xFFFFFFFF).astype('int32').astype('int64')
+
+    def get_summary(self):
+        """Counts and extreme deltas of the diff."""
+
+        delta = self.deltas['utilization']
+        finite = delta[np.isfinite(delta)]
+
+        return {
+            'points_a': len(self.a['validate']),
+            'points_b': len(self.b['validate']),
+            'common': len(self.key),
+            'removed': len(self.removed),
+            'added': len(self.added),
+            'new_failures': int(self.new_failures.sum()),
+            'new_passes': int(self.new_passes.sum()),
+            'increased': int((finite > 0).sum()),
+            'decreased': int((finite < 0).sum()),
+            'max_increase': float(max(finite.max(), 0.0)) if len(finite)
+            else 0.0,
+            'max_decrease': float(min(finite.min(), 0.0)) if len(finite)
+            else 0.0
+            }
+
+    def get_regressions(self, n=20, ratio='utilization'):
+        """
+        pandas DataFrame with the n largest regressions: the new failures
+        first and then the highest increases of ratio.
+        """
+
+        import pandas as pd
+
+        delta = self.deltas[ratio]
+        score = np.where(np.isnan(delta), -np.inf, delta)
+        order = np.lexsort((-score, ~self.new_failures))[:n]
+
+        bar, node = self.get_bar_node(self.key[order])
+        df = pd.DataFrame({'bar': bar, 'node': node})
+        for name in RATIOS:
+            df[name + '_a'] = self.a[name][self.index_a[order]]
+            df[name + '_b'] = self.b[name][self.index_b[order]]
+        df['delta'] = delta[order]
+        df['Validate_a'] = np.where(
+            self.a['validate'][self.index_a[order]], 'yes', 'no'
+            )
+        df['Validate_b'] = np.where(
+            self.b['validate'][self.index_b[order]], 'yes', 'no'
+            )
+
+        return df
+
+    def get_flips(self):
+        """pandas DataFrame with the points whose verdict changed."""
+
+        import pandas as pd
+
+        flips = np.flatnonzero(self.new_failures | self.new_passes)
+        bar, node = self.get_bar_node(self.key[flips])
+
+        return pd.DataFrame({
+            'bar': bar,
+            'node': node,
+            'utilization_a': self.a['utilization'][self.index_a[flips]],
+            'utilization_b': self.b['utilization'][self.index_b[flips]],
+            'Validate_b': np.where(self.new_passes[flips], 'yes', 'no')
+            })
+
+
+def main():
+    """Command line entry point of the diff of two result stores."""
+
+    parser = argparse.ArgumentParser(
+        description='Diff of the fatigue results of two model revisions.'
+        )
+    parser.add_argument('store_a', help='result store of the old revision')
+    parser.add_argument('store_b', help='result store of the new revision')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--ratio', default='utilization', choices=RATIOS)
+    args = parser.parse_args()
+
+    diff = ResultDiff(args.store_a, args.store_b)
+    for key, value in diff.get_summary().items():
+        print(f'{key:<13}: {value:.3f}' if isinstance(value, float)
+              else f'{key:<13}: {value}')
+    print(diff.get_regressions(args.top, args.ratio).to_string(index=False))
+
+
+if __name__ == '__main__':
+
+    main()
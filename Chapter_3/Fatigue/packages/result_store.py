@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Compact result storage of the fatigue check in memory-mapped files
+
+Created on 19 Oct 2026 10:53
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .fatigue_kernel import INPUTS, OUTPUTS
+from .tables import CATEGORIES, encode
+
+
+# Columns of the store: (DataFrame column, dtype, decimals).
+COLUMNS = {
+    'bar': ('bar', 'int64', None),
+    'node': ('node', 'int64', None),
+    'component_group': ('component_group', 'int8', None),
+    'noth_effect': ('noth_effect', 'int8', None),
+    'sigma_x_max': (INPUTS['sigma_x_max'], 'float64', None),
+    'sigma_y_max': (INPUTS['sigma_y_max'], 'float64', None),
+    'tau_xy_max': (INPUTS['tau_xy_max'], 'float64', None),
+    'sigma_tx': (OUTPUTS['sigma_tx'], 'float32', 1),
+    'sigma_cx': (OUTPUTS['sigma_cx'], 'float32', 1),
+    'sigma_ty': (OUTPUTS['sigma_ty'], 'float32', 1),
+    'sigma_cy': (OUTPUTS['sigma_cy'], 'float32', 1),
+    'tau_a': (OUTPUTS['tau_a'], 'float32', 2),
+    'sigma_xa': (OUTPUTS['sigma_xa'], 'float32', 2),
+    'sigma_ya': (OUTPUTS['sigma_ya'], 'float32', 2),
+    'ratio_s_x': (OUTPUTS['ratio_s_x'], 'float32', 2),
+    'ratio_s_y': (OUTPUTS['ratio_s_y'], 'float32', 2),
+    'ratio_t_xy': (OUTPUTS['ratio_t_xy'], 'float32', 2),
+    'ratio_1': (OUTPUTS['ratio_1'], 'float32', 2),
+    'ratio_2': (OUTPUTS['ratio_2'], 'float32', 2),
+    'validate': (OUTPUTS['validate'], 'bool', None),
+    'screened': ('screened', 'bool', None)
+    }
+
+
+class ResultStore:
+    """
+    Results of the fatigue check in a directory with one memory-mapped file
+    per column: int64 bars and nodes, float64 input stresses, float32
+    permissible stresses and ratios, boolean Validate and int8 categorical
+    codes for the component group and the notch effect.
+
+    The input stresses are kept as read, without rounding. The permissible
+    stresses and ratios are rounded to 0.1 or 0.01 MPa, so float32 keeps
+    them and get_df() gives back the float64 values of the notebook. Other
+    processes can open the same directory in read mode without a reload.
+    """
+
+    def __init__(self, path, mode='r'):
+        """
+        Asumes path is the directory of an existing store, open its columns.
+
+        Parameters
+        ----------
+        path : str ; directory of the store.
+        mode : str ; 'r' read only, 'r+' read and write.
+        """
+
+        self.path = path
+        self.mode = mode
+
+        with open(self.get_meta_path()) as f:
+            self.meta = json.load(f)
+        self.n_rows = self.meta['n_rows']
+        self.columns = self.map_columns()
+
+    @classmethod
+    def create(cls, path, n_rows=0):
+        """Create an empty store for n_rows in the directory path."""
+
+        os.makedirs(path, exist_ok=True)
+        for name, (col, dtype, decimals) in COLUMNS.items():
+            with open(os.path.join(path, name + '.bin'), 'wb') as f:
+                f.truncate(n_rows * np.dtype(dtype).itemsize)
+        meta = {
+            'n_rows': n_rows,
+            'columns': {
+                name: dtype for name, (c, dtype, d) in COLUMNS.items()
+                },
+            'categories': CATEGORIES
+            }
+        cls.write_meta(path, meta)
+
+        return cls(path, mode='r+')
+
+    @staticmethod
+    def write_meta(path, meta):
+        """Write the metadata of the store, replaced atomically."""
+
+        tmp = os.path.join(path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp, os.path.join(path, 'meta.json'))
+
+    def get_meta_path(self):
+        """Path of the metadata file."""
+
+        return os.path.join(self.path, 'meta.json')
+
+    def get_column_path(self, name):
+        """Path of the file of the column name."""
+
+        return os.path.join(self.path, name + '.bin')
+
+    def map_columns(self):
+        """Memory-mapped arrays of the columns."""
+
+        columns = {}
+        for name, dtype in self.meta['columns'].items():
+            if self.n_rows:
+                columns[name] = np.memmap(
+                    self.get_column_path(name), dtype=dtype, mode=self.mode,
+                    shape=(self.n_rows,)
+                    )
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+
+        return columns
+
+    def get_column(self, name):
+        """Memory-mapped array of the column name."""
+
+        return self.columns[name]
+
+    def get_n_rows(self):
+        """Number of rows of the store."""
+
+        return self.n_rows
+
+    def write(self, start, columns):
+        """
+        Write the arrays of columns from the row start.
+
+        Parameters
+        ----------
+        start   : int  ; first row.
+        columns : dict ; arrays of the columns of the store, with the kernel
+                         names; missing columns are left untouched.
+        """
+
+        for name, values in columns.items():
+            if name not in self.columns:
+                continue
+            if name in CATEGORIES and np.asarray(values).dtype.kind != 'i':
+                values = encode(name, values)
+            elif name in ('bar', 'node') and len(values):
+                info = np.iinfo(self.columns[name].dtype)  # int32 if older.
+                if np.min(values) < info.min or np.max(values) > info.max:
+                    raise OverflowError(
+                        f"'{name}' out of the range of {info.dtype}"
+                        )
+            stop = start + len(values)
+            self.columns[name][start:stop] = values
+
+    def write_df(self, start, df, results=None):
+        """
+        Write the pandas DataFrame df of the notebook from the row start,
+        with the output arrays of the kernel in results when given.
+        """
+
+        columns = {}
+        for name, (col, dtype, decimals) in COLUMNS.items():
+            if col in df.columns:
+                columns[name] = df[col].to_numpy()
+        if OUTPUTS['validate'] in df.columns:
+            columns['validate'] = columns['validate'] == 'yes'
+        if results is not None:
+            columns.update(results)
+        self.write(start, columns)
+
+    def resize(self, n_rows):
+        """Grow or shrink the store to n_rows."""
+
+        self.flush()
+        self.columns = {}
+        for name, dtype in self.meta['columns'].items():
+            with open(self.get_column_path(name), 'r+b') as f:
+                f.truncate(n_rows * np.dtype(dtype).itemsize)
+        self.meta['n_rows'] = self.n_rows = n_rows
+        self.write_meta(self.path, self.meta)
+        self.columns = self.map_columns()
+
+    def append(self, columns):
+        """Append the arrays of columns at the end of the store."""
+
+        start = self.n_rows
+        n = len(next(iter(columns.values())))
+        self.resize(start + n)
+        self.write(start, columns)
+
+        return start
+
+    def flush(self):
+        """Flush the memory-mapped columns to disk."""
+
+        for values in self.columns.values():
+            if isinstance(values, np.memmap):
+                values.flush()
+
+    def sync(self):
+        """Flush the columns and wait until the files are on disk."""
+
+        self.flush()
+        for name in list(self.meta['columns']) + [None]:
+            path = self.get_meta_path() if name is None \
+                else self.get_column_path(name)
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def get_df(self, start=0, stop=None):
+        """
+        pandas DataFrame with the rows [start:stop] and the columns of the
+        notebook.
+        """
+
+        import pandas as pd
+
+        d = {}
+        for name, (col, dtype, decimals) in COLUMNS.items():
+            if name not in self.columns:  # Store of an older version.
+                continue
+            values = self.columns[name][start:stop]
+            if name in CATEGORIES:
+                values = pd.Categorical.from_codes(
+                    values, self.meta['categories'][name]
+                    )
+            elif name == 'validate':
+                values = np.where(values, 'yes', 'no')
+            elif decimals is not None:
+                values = np.round(values.astype(float), decimals)
+            elif values.dtype == 'float32':  # Input stresses, older version.
+                values = np.round(values.astype(float), 2)
+            d[col] = values
+
+        return pd.DataFrame(d)
+
+
+if __name__ == '__main__':
+
+    import pandas as pd
+    import tempfile
+
+    from .fatigue_kernel import (
+        FatigueKernel, empty_results, kernel_inputs
+        )
+    from .tables import GROUPS, NOTCHES
+
+    rng = np.random.default_rng(0)
+    n = 100_000
+    df = pd.DataFrame({
+        'bar': rng.integers(1, 500, n),
+        'node': rng.integers(1, 2000, n),
+        'component_group': rng.choice(GROUPS, n),
+        'noth_effect': rng.choice(NOTCHES, n),
+        'sigma_W_[MPa]': rng.integers(27, 84, n).astype(float),
+        'sigma_W0_[MPa]': rng.integers(120, 164, n).astype(float),
+        'k_sx': rng.uniform(-1, 1, n),
+        'k_sy': rng.uniform(-1, 1, n),
+        'k_txy': rng.uniform(-1, 1, n),
+        'sigma_x_max_[MPa]': rng.integers(-120, 120, n).astype(float),
+        'sigma_y_max_[MPa]': rng.integers(-40, 40, n).astype(float),
+        'tau_xy_max_[MPa]': rng.integers(-4, 4, n).astype(float)
+        })
+
+    results = empty_results(n)
+    FatigueKernel(280, 440).run(kernel_inputs(df), results)
+
+    with tempfile.TemporaryDirectory() as path:
+        store = ResultStore.create(path, n)
+        store.write_df(0, df, results)
+        store.flush()
+
+        size = sum(
+            os.path.getsize(store.get_column_path(name)) for name in COLUMNS
+            )
+        print(f'store      : {size / 2**20:.1f} MiB')
+
+        reader = ResultStore(path)
+        print(reader.get_df().head())
+        del store, reader
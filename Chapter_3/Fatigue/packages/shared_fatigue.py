@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Multi-process fatigue check of one model over shared memory
+
+Created on 19 Oct 2026 10:52
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .fatigue_kernel import INPUTS, OUTPUTS, FatigueKernel
+
+
+FLOAT_OUTPUTS = [key for key in OUTPUTS if key != 'validate']
+
+_worker = {}  # Shared arrays and kernel of the worker process.
+
+
+def _views(shm_inputs, shm_outputs, shm_validate, n_rows):
+    """Input and output arrays over the shared memory blocks."""
+
+    a = np.ndarray((len(INPUTS), n_rows), dtype=float, buffer=shm_inputs.buf)
+    b = np.ndarray(
+        (len(FLOAT_OUTPUTS), n_rows), dtype=float, buffer=shm_outputs.buf
+        )
+    inputs = dict(zip(INPUTS, a))
+    results = dict(zip(FLOAT_OUTPUTS, b))
+    results['validate'] = np.ndarray(
+        n_rows, dtype=bool, buffer=shm_validate.buf
+        )
+
+    return inputs, results
+
+
+def _attach(names, n_rows, sigma_E, sigma_R, backend):
+    """Initializer of the worker processes, attach the shared memory."""
+
+    shms = [SharedMemory(name=name) for name in names]
+    inputs, results = _views(*shms, n_rows)
+    _worker['shms'] = shms  # Keep the blocks open while the worker lives.
+    _worker['inputs'] = inputs
+    _worker['results'] = results
+    _worker['kernel'] = FatigueKernel(sigma_E, sigma_R, backend)
+
+
+def _run_slice(start, stop):
+    """Fatigue check of the rows [start:stop] in the worker process."""
+
+    _worker['kernel'].run(_worker['inputs'], _worker['results'], start, stop)
+
+    return stop - start
+
+
+class SharedFatigue:
+    """
+    Fatigue check of one model partitioned by row ranges over worker
+    processes.
+
+    The input arrays are copied once into a shared memory block and the
+    results land in shared output blocks, so the workers receive only the
+    names of the blocks and the row ranges, nothing is pickled. Use it as a
+    context manager, or call close(), to release the shared memory.
+    """
+
+    def __init__(self, n_rows, sigma_E, sigma_R, n_workers=None,
+                 chunk_size=None, backend='numpy'):
+        """
+        Asumes n_rows, sigma_E and sigma_R the data for the calculation of
+        the stresses for fatigue, allocate the shared memory of the model.
+
+        Parameters
+        ----------
+        n_rows     : int ; number of evaluation points of the model.
+        sigma_E    : int ; [MPa] elastic limit of steel.
+        sigma_R    : int ; [MPa] ultimate tensile strength of steel.
+        n_workers  : int ; number of worker processes, all the cores by
+                           default.
+        chunk_size : int ; number of rows of every task, four tasks per
+                           worker by default.
+        backend    : str ; compute backend of the formulae.
+        """
+
+        self.n_rows = n_rows
+        self.sigma_E = sigma_E
+        self.sigma_R = sigma_R
+        self.backend = backend
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or max(
+            1, -(-n_rows // (4 * self.n_workers))
+            )
+
+        size = max(1, n_rows) * 8
+        self.shms = [
+            SharedMemory(create=True, size=len(INPUTS) * size),
+            SharedMemory(create=True, size=len(FLOAT_OUTPUTS) * size),
+            SharedMemory(create=True, size=max(1, n_rows))
+            ]
+        self.inputs, self.results = _views(*self.shms, n_rows)
+
+    @classmethod
+    def from_df(cls, df, sigma_E, sigma_R, **kwargs):
+        """
+        Shared fatigue check with the input arrays copied from df, the
+        pandas DataFrame of the notebook after the join of sigma_W and
+        sigma_W0.
+        """
+
+        shared = cls(len(df.index), sigma_E, sigma_R, **kwargs)
+        for key, col in INPUTS.items():
+            shared.inputs[key][:] = df[col].to_numpy(dtype=float)
+
+        return shared
+
+    def get_inputs(self):
+        """Input arrays in shared memory, to be filled in place."""
+
+        return self.inputs
+
+    def get_slices(self):
+        """List with the (start, stop) rows of every task."""
+
+        return [
+            (start, min(start + self.chunk_size, self.n_rows))
+            for start in range(0, self.n_rows, self.chunk_size)
+            ]
+
+    def run(self):
+        """
+        Output arrays of the kernel in shared memory, valid until the
+        shared memory is closed.
+        """
+
+        names = [shm.name for shm in self.shms]
+        starts, stops = zip(*self.get_slices()) if self.n_rows else ((), ())
+        with ProcessPoolExecutor(
+                self.n_workers, initializer=_attach,
+                initargs=(
+                    names, self.n_rows, self.sigma_E, self.sigma_R,
+                    self.backend
+                    )
+                ) as pool:
+            list(pool.map(_run_slice, starts, stops))
+
+        return self.results
+
+    def close(self):
+        """Release the shared memory."""
+
+        self.inputs = self.results = None
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+        self.shms = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+
+    import time
+
+    sigma_E = 280
+    sigma_R = 440
+    n = 5_000_000
+
+    with SharedFatigue(n, sigma_E, sigma_R) as shared:
+        rng = np.random.default_rng(0)
+        inputs = shared.get_inputs()
+        inputs['sigma_W'][:] = rng.integers(27, 84, n)
+        inputs['sigma_W0'][:] = rng.integers(120, 164, n)
+        inputs['k_sx'][:] = rng.uniform(-1, 1, n)
+        inputs['k_sy'][:] = rng.uniform(-1, 1, n)
+        inputs['k_txy'][:] = rng.uniform(-1, 1, n)
+        inputs['sigma_x_max'][:] = rng.integers(-120, 120, n)
+        inputs['sigma_y_max'][:] = rng.integers(-40, 40, n)
+        inputs['tau_xy_max'][:] = rng.integers(-4, 4, n)
+
+        t0 = time.perf_counter()
+        results = shared.run()
+        t1 = time.perf_counter()
+
+        print(f'{n} points in {t1 - t0:.3f} s')
+        print(f'validated: {results["validate"].sum()}')
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Tables of the steels and basic stresses, and the categorical codes
+
+Created on 19 Oct 2026 11:26
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+
+from .backends import BACKENDS
+from .fatigue_kernel import FatigueKernel
+from .steelvalues import SteelValues
+
+
+# Directory with structural_steel.db and sigmaW.db of the repository.
+DB_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, 'SQL'
+    )
+
+
+# Component groups and cases of notch effect of sigmaW.db.
+GROUPS = ['E1', 'E2', 'E3', 'E4', 'E5', 'E6', 'E7', 'E8']
+NOTCHES = ['W0', 'W1', 'W2', 'K0', 'K1', 'K2', 'K3', 'K4']
+
+CATEGORIES = {'component_group': GROUPS, 'noth_effect': NOTCHES}
+
+
+def encode(name, values):
+    """
+    Categorical codes of the values of the column name, -1 for the values
+    not in the categories and for the values that are not strings, as
+    blank cells (None, NaN) and numbers.
+    """
+
+    categories = np.asarray(CATEGORIES[name], dtype=object)
+    values = np.asarray(values, dtype=object)
+    is_str = np.frompyfunc(lambda v: isinstance(v, str), 1, 1)(values)
+    is_str = is_str.astype(bool)
+    order = np.argsort(categories)
+    pos = np.searchsorted(categories[order], values[is_str])
+    pos = np.minimum(pos, len(categories) - 1)
+    codes = np.full(len(values), -1, dtype='int8')
+    found = order[pos]
+    codes[is_str] = np.where(categories[found] == values[is_str], found, -1)
+
+    return codes
+
+
+class Tables:
+    """
+    Material and basic stress tables loaded once from structural_steel.db
+    and sigmaW.db, with a fatigue kernel per steel grade.
+    """
+
+    def __init__(self, db_dir, backend='numpy'):
+        """
+        Parameters
+        ----------
+        db_dir  : str ; directory with structural_steel.db and sigmaW.db.
+        backend : str ; compute backend of the formulae.
+        """
+
+        import pandas as pd
+
+        conn = sqlite3.connect(os.path.join(db_dir, 'structural_steel.db'))
+        df_steel = pd.read_sql('SELECT * FROM EN_1993_1_1;', conn)
+        conn.close()
+
+        conn = sqlite3.connect(os.path.join(db_dir, 'sigmaW.db'))
+        self.sigma_W = {}  # [group, notch] basic stress for every table.
+        self.kernels = {}
+        for steel_grade in SteelValues(df_steel, 'S 235').d1:
+            steel_values = SteelValues(df_steel, steel_grade)
+            table = steel_values.get_steel_for_db()
+            if table not in self.sigma_W:
+                df_sW = pd.read_sql('SELECT * FROM ' + table + ';', conn)
+                df_sW = df_sW.set_index('component_group')
+                self.sigma_W[table] = df_sW.reindex(
+                    index=GROUPS, columns=NOTCHES
+                    ).to_numpy(dtype=float)
+            self.kernels[steel_grade] = (
+                table,
+                FatigueKernel(
+                    steel_values.elastic_limit(),
+                    steel_values.ultimate_tensile_strength(),
+                    backend
+                    )
+                )
+        conn.close()
+
+    def get_steel_grades(self):
+        """List with the steel grades."""
+
+        return list(self.kernels)
+
+    def get_kernel(self, steel_grade):
+        """Fatigue kernel of the steel grade."""
+
+        return self.kernels[steel_grade][1]
+
+    def get_sigma_W(self, steel_grade):
+        """[group, notch] basic stresses of the steel grade."""
+
+        return self.sigma_W[self.kernels[steel_grade][0]]
+
+    def inputs(self, steel_grade, points):
+        """
+        Kernel inputs for the points of a request: ratios k as in the
+        notebook and sigma_W, sigma_W0 from the tables. Raises IngestError
+        for bad points.
+
+        Parameters
+        ----------
+        steel_grade : str  ; steel grade of the material.
+        points      : dict ; arrays of the columns of the points.
+        """
+
+        from .ingest import Ingest  # Ingest encodes with this module.
+
+        ingest = Ingest(points, rsa_sign=False, ids=[])
+
+        return ingest.kernel_inputs(self.get_sigma_W(steel_grade))
+
+
+def add_arguments(parser, steel_grade=True):
+    """
+    Add the options of the tables to the argparse parser of a command line
+    entry point: --steel-grade, --db-dir and --backend.
+    """
+
+    if steel_grade:
+        parser.add_argument('--steel-grade', default='S 355')
+    parser.add_argument(
+        '--db-dir', default=DB_DIR,
+        help='directory with structural_steel.db and sigmaW.db'
+        )
+    parser.add_argument(
+        '--backend', default='numpy', choices=list(BACKENDS),
+        help='compute backend of the formulae'
+        )
+
+
+def get_tables(args):
+    """Tables of the options of add_arguments parsed into args."""
+
+    return Tables(args.db_dir, args.backend)
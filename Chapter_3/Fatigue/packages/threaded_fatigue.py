@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+FEM 2131/2132
+3-4.5.1 Fatigue check for structural elemensts
+Thread-parallel fatigue check of one run
+
+Created on 19 Oct 2026 10:52
+
+__author__ = Pedro Biel
+__version__ = 0.0.0
+__email__ = pbiel@taimweser.com
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .fatigue_kernel import (
+    FatigueKernel, empty_results, kernel_inputs, results_to_df
+    )
+
+
+class ThreadedFatigue:
+    """
+    Fatigue check of one run split into row blocks and component chains
+    evaluated on a thread pool.
+
+    The x, y and shear chains are independent until the combined stress
+    ratios, so for every block of rows the five permissible stresses are
+    evaluated in parallel and, once all of them are done, the ratios of the
+    block. The NumPy, numexpr and jit backends release the GIL, so the
+    threads run on all the cores. Every task writes in its own slice of the
+    preallocated outputs.
+    """
+
+    def __init__(self, df, sigma_E, sigma_R, n_threads=None,
+                 block_size=65536, backend='numpy', profile=None):
+        """
+        Asumes df, sigma_E and sigma_R the data for the calculation of the
+        stresses for fatigue, get the permissible stresses and the ratios of
+        the run on n_threads threads.
+
+        Parameters
+        ----------
+        df         : pandas DataFrame ; data for the calculation of the
+                                        stresses for fatigue.
+        sigma_E    : int              ; [MPa] elastic limit of steel.
+        sigma_R    : int              ; [MPa] ultimate tensile strength of
+                                        steel.
+        n_threads  : int              ; number of threads, all the cores by
+                                        default.
+        block_size : int              ; number of rows of every block.
+        backend    : str              ; compute backend of the formulae.
+        profile    : KernelProfile    ; opt-in profile of the checked rows.
+        """
+
+        self.df = df
+        self.kernel = FatigueKernel(sigma_E, sigma_R, backend, profile)
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self.block_size = block_size
+
+        self.inputs = kernel_inputs(df)
+        self.n_rows = len(df.index)
+
+    def get_blocks(self):
+        """List with the (start, stop) rows of every block."""
+
+        return [
+            (start, min(start + self.block_size, self.n_rows))
+            for start in range(0, self.n_rows, self.block_size)
+            ]
+
+    def run(self):
+        """Output arrays of the kernel for the whole run."""
+
+        results = empty_results(self.n_rows)
+        blocks = self.get_blocks()
+
+        with ThreadPoolExecutor(self.n_threads) as pool:
+            futures = [
+                pool.submit(chain)
+                for start, stop in blocks
+                for name, chain in self.kernel.chains(
+                    self.inputs, results, start, stop
+                    )
+                ]
+            for future in futures:
+                future.result()
+
+            futures = [
+                pool.submit(
+                    self.kernel.ratios, self.inputs, results, start, stop
+                    )
+                for start, stop in blocks
+                ]
+            for future in futures:
+                future.result()
+
+        return results
+
+    def get_df(self):
+        """Copy of the DataFrame with the columns of the fatigue check."""
+
+        return results_to_df(self.df, self.run())
+
+
+if __name__ == '__main__':
+
+    import pandas as pd
+    import time
+
+    sigma_E = 280
+    sigma_R = 440
+    n = 2_000_000
+
+    rng = np.random.default_rng(0)
+    d = {
+        'sigma_W_[MPa]': rng.integers(27, 84, n).astype(float),
+        'sigma_W0_[MPa]': rng.integers(120, 164, n).astype(float),
+        'k_sx': rng.uniform(-1, 1, n),
+        'k_sy': rng.uniform(-1, 1, n),
+        'k_txy': rng.uniform(-1, 1, n),
+        'sigma_x_max_[MPa]': rng.integers(-120, 120, n).astype(float),
+        'sigma_y_max_[MPa]': rng.integers(-40, 40, n).astype(float),
+        'tau_xy_max_[MPa]': rng.integers(-4, 4, n).astype(float)
+        }
+    df = pd.DataFrame(d)
+
+    t0 = time.perf_counter()
+    serial = empty_results(n)
+    FatigueKernel(sigma_E, sigma_R).run(kernel_inputs(df), serial)
+    t1 = time.perf_counter()
+    threaded = ThreadedFatigue(df, sigma_E, sigma_R).run()
+    t2 = time.perf_counter()
+
+    print(f'serial   : {t1 - t0:.3f} s')
+    print(f'threaded : {t2 - t1:.3f} s')
+    same = all(
+        np.array_equal(serial[key], threaded[key]) for key in serial
+        )
+    print(f'same     : {same}')